@@ -65,4 +65,23 @@ INFOBOX_CONFIG = {
             'origin': ['origin', 'location']
         }
     }
-}
\ No newline at end of file
+}
+
+# Reverse map per category: infobox label -> canonical field name, so consumers
+# resolve a row label with one dict lookup instead of scanning every alias list
+INFOBOX_FIELD_ALIASES = {
+    category: {
+        alias: field
+        for field, aliases in config['key_fields'].items()
+        for alias in aliases
+    }
+    for category, config in INFOBOX_CONFIG.items()
+}
+
+# Freeze infobox lookups at import: alias lists become frozensets for O(1)
+# membership, target classes stay ordered (most specific first) as tuples
+for _config in INFOBOX_CONFIG.values():
+    _config['target_classes'] = tuple(_config['target_classes'])
+    _config['key_fields'] = {
+        field: frozenset(aliases) for field, aliases in _config['key_fields'].items()
+    }
@@ -1,11 +1,42 @@
+import atexit
 import logging
+import queue
+import re
 import sys
 import os
-from logging.handlers import RotatingFileHandler
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
+# Emoji pattern compiled once at import - remove_emojis runs on every log fallback.
+# Block-based class: pictographs/emoticons/flags, misc symbols & dingbats, plus
+# VS16 and ZWJ so joined sequences are stripped in a single pass
+_EMOJI_RE = re.compile(
+    "["
+    "\U0001F000-\U0001FFFF"  # emoticons, pictographs, transport, flags
+    "\U00002600-\U000027BF"  # misc symbols & dingbats
+    "\uFE0F"                  # variation selector-16
+    "\u200D"                  # zero width joiner
+    "]+"
+)
+
+_LOG_LEVELS = {
+    'CRITICAL': logging.CRITICAL,
+    'ERROR': logging.ERROR,
+    'WARNING': logging.WARNING,
+    'INFO': logging.INFO,
+    'DEBUG': logging.DEBUG,
+}
+
+# Set once handlers are installed - reimports (uvicorn reload, workers) must not
+# tear down and rebuild handlers or open the log file again
+_logging_configured = False
+
 def setup_logging(log_level: str = "INFO", log_file: str = None):
     """Setup logging configuration with proper Unicode support for Windows"""
+    global _logging_configured
+    if _logging_configured:
+        return logging.getLogger(__name__)
     
     # Create logs directory if it doesn't exist
     logs_dir = Path("logs")
@@ -27,7 +58,7 @@ def setup_logging(log_level: str = "INFO", log_file: str = None):
     
     # Configure root logger
     logging.basicConfig(
-        level=getattr(logging, log_level.upper()),
+        level=_LOG_LEVELS.get(log_level.upper(), logging.INFO),
         format='%(asctime)s | %(levelname)-8s | %(message)s',
         datefmt='%H:%M:%S',
         handlers=[
@@ -41,7 +72,7 @@ def setup_logging(log_level: str = "INFO", log_file: str = None):
     if log_file:
         file_handler = RotatingFileHandler(
             log_file,
-            maxBytes=10*1024*1024,  # 10MB
+            maxBytes=64*1024*1024,  # 64MB - fewer rollover checks/rotations
             backupCount=5,
             encoding=encoding  # Explicit UTF-8 encoding
         )
@@ -51,14 +82,26 @@ def setup_logging(log_level: str = "INFO", log_file: str = None):
                 datefmt='%Y-%m-%d %H:%M:%S'
             )
         )
-        logging.getLogger().addHandler(file_handler)
+        # Write to file from a background thread so request handlers never
+        # block on disk IO; the root logger only enqueues records
+        log_queue = queue.Queue(-1)
+        listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        logging.getLogger().addHandler(QueueHandler(log_queue))
+    else:
+        listener = None
     
     # Set specific logger levels
     logging.getLogger("uvicorn").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("httpcore").setLevel(logging.WARNING)
     
-    return logging.getLogger(__name__)
+    logger = logging.getLogger(__name__)
+    # Exposed so the app can flush and stop the file writer on shutdown
+    logger.queue_listener = listener
+    _logging_configured = True
+    return logger
 
 # Emoji-safe logging functions
 def safe_log_info(logger, message: str):
@@ -90,20 +133,15 @@ def safe_log_warning(logger, message: str):
 
 def remove_emojis(text: str) -> str:
     """Remove emojis from text for safe logging"""
-    import re
-    # Remove emoji characters
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F680-\U0001F6FF"  # transport & map symbols
-        "\U0001F1E0-\U0001F1FF"  # flags (iOS)
-        "\U00002702-\U000027B0"
-        "\U000024C2-\U0001F251"
-        "]+", 
-        flags=re.UNICODE
-    )
-    return emoji_pattern.sub(r'', text).strip()
+    # Plain ASCII can't contain emojis - skip the regex engine entirely
+    if not text or text.isascii():
+        return text.strip() if text else text
+    return _strip_emojis(text)
+
+@lru_cache(maxsize=1024)
+def _strip_emojis(text: str) -> str:
+    """Cached regex pass - templated log lines repeat the same text"""
+    return _EMOJI_RE.sub(r'', text).strip()
 
 # Create a safe logger class
 class SafeLogger:
@@ -111,17 +149,36 @@ class SafeLogger:
     
     def __init__(self, logger):
         self.logger = logger
+        # UTF-8 consoles (Linux/macOS, reconfigured Windows) never raise
+        # UnicodeEncodeError, so they can log directly without the fallback
+        self._utf8 = (getattr(sys.stdout, 'encoding', None) or '').lower().startswith('utf')
     
     def info(self, message: str):
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        if self._utf8:
+            return self.logger.info(message)
         safe_log_info(self.logger, message)
     
     def error(self, message: str):
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
+        if self._utf8:
+            return self.logger.error(message)
         safe_log_error(self.logger, message)
     
     def warning(self, message: str):
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
+        if self._utf8:
+            return self.logger.warning(message)
         safe_log_warning(self.logger, message)
     
     def debug(self, message: str):
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if self._utf8:
+            return self.logger.debug(message)
         try:
             self.logger.debug(message)
         except UnicodeEncodeError:
@@ -0,0 +1,15 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Direct Postgres connection (optional) for bulk imports that bypass PostgREST.
+# Kept apart from config.database so importing it doesn't create a Supabase client
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+async def get_pg_pool(min_size: int = 4, max_size: int = 10):
+    """Create an asyncpg connection pool, None when DATABASE_URL isn't configured"""
+    if not DATABASE_URL:
+        return None
+    import asyncpg
+    return await asyncpg.create_pool(DATABASE_URL, min_size=min_size, max_size=max_size)
@@ -0,0 +1,144 @@
+-- Server-side ranking helpers used by the import scripts
+
+-- Top N games by composite accolade score: 60% critics, 40% users, plus GOTY bonus.
+-- Non-numeric metacritic values score 0 instead of failing the cast
+CREATE OR REPLACE FUNCTION top_games(n INTEGER DEFAULT 50)
+RETURNS TABLE (id UUID, name VARCHAR, score NUMERIC) AS $$
+    SELECT i.id, i.name,
+        COALESCE(SUM(
+            CASE
+                WHEN a.type = 'metacritic_critics' AND a.value ~ '^[0-9]+$' THEN a.value::int * 0.6
+                WHEN a.type = 'metacritic_users' AND a.value ~ '^[0-9]+$' THEN a.value::int * 0.4
+                WHEN a.type = 'goty' THEN 10
+                ELSE 0
+            END
+        ), 0) AS score
+    FROM items i
+    LEFT JOIN accolades a ON a.item_id = i.id
+    WHERE i.category = 'games'
+    GROUP BY i.id
+    ORDER BY score DESC
+    LIMIT n;
+$$ LANGUAGE sql STABLE;
+
+-- Distinct non-null groups for a category, deduplicated in Postgres instead of
+-- shipping every item's group to the client
+CREATE OR REPLACE FUNCTION get_distinct_groups(cat TEXT)
+RETURNS TABLE ("group" VARCHAR) AS $$
+    SELECT DISTINCT i."group"
+    FROM items i
+    WHERE i.category = cat::category_enum
+      AND i."group" IS NOT NULL
+    ORDER BY 1;
+$$ LANGUAGE sql STABLE;
+
+CREATE INDEX IF NOT EXISTS idx_items_category_group ON items(category, "group");
+
+-- Flat list item rows with the item's columns prefixed item_, so get_list_items reads a
+-- plain join instead of PostgREST building an embedded JSON object per row
+CREATE OR REPLACE VIEW list_items_with_details AS
+SELECT
+    li.id,
+    li.list_id,
+    li.ranking,
+    li.created_at,
+    li.updated_at,
+    i.id AS item_id,
+    i.name AS item_name,
+    i.category AS item_category,
+    i.subcategory AS item_subcategory,
+    i.reference_url AS item_reference_url,
+    i.image_url AS item_image_url,
+    i.description AS item_description,
+    i.item_year AS item_item_year,
+    i.view_count AS item_view_count,
+    i.selection_count AS item_selection_count,
+    i.created_at AS item_created_at,
+    i.updated_at AS item_updated_at
+FROM list_items li
+JOIN items i ON i.id = li.item_id;
+
+-- Apply a batch of list rankings in one round-trip and return the reranked list
+-- as list_items_with_details rows. Rankings are applied one UPDATE at a time, in array
+-- order, so the trigger_rerank_list_items shifting behaves exactly as it does
+-- for individual updates
+CREATE OR REPLACE FUNCTION apply_list_rankings(p_list_id UUID, p_rankings JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    r JSONB;
+    v_items JSONB;
+BEGIN
+    FOR r IN SELECT * FROM jsonb_array_elements(p_rankings)
+    LOOP
+        UPDATE list_items
+        SET ranking = (r->>'new_ranking')::INTEGER
+        WHERE list_id = p_list_id
+        AND item_id = (r->>'item_id')::UUID;
+    END LOOP;
+    
+    SELECT COALESCE(jsonb_agg(to_jsonb(v.*) ORDER BY v.ranking), '[]'::JSONB)
+    INTO v_items
+    FROM list_items_with_details v
+    WHERE v.list_id = p_list_id;
+    
+    RETURN v_items;
+END;
+$$ language 'plpgsql';
+
+-- Net vote total for an item over the last p_days, summed server-side so hot items
+-- return one integer instead of every vote row
+CREATE OR REPLACE FUNCTION get_item_recent_vote_sum(p_item_id UUID, p_days INTEGER)
+RETURNS INTEGER AS $$
+    SELECT COALESCE(SUM(vote_value), 0)::INTEGER
+    FROM user_votes
+    WHERE item_id = p_item_id
+      AND created_at > NOW() - make_interval(days => p_days);
+$$ LANGUAGE sql STABLE;
+
+CREATE INDEX IF NOT EXISTS idx_user_votes_item_created ON user_votes(item_id, created_at);
+
+-- Refresh and return an item's analytics in one call. popularity_score weights
+-- selections over views; trending_score is the net vote total of the last 7 days
+-- (the same window trending_items uses). Returns NULL for unknown items
+CREATE OR REPLACE FUNCTION get_item_analytics(p_item_id UUID)
+RETURNS JSONB AS $$
+DECLARE
+    v_analytics JSONB;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM items WHERE id = p_item_id) THEN
+        RETURN NULL;
+    END IF;
+    
+    PERFORM update_item_statistics(p_item_id);
+    
+    SELECT jsonb_build_object(
+        'item_id', s.item_id,
+        'total_appearances', s.total_appearances,
+        'average_ranking', s.average_ranking,
+        'best_ranking', s.best_ranking,
+        'worst_ranking', s.worst_ranking,
+        'ranking_variance', s.ranking_variance,
+        'top_10_count', s.top_10_count,
+        'top_3_count', s.top_3_count,
+        'first_place_count', s.first_place_count,
+        'popularity_score', COALESCE(i.view_count, 0) * 0.3 + COALESCE(i.selection_count, 0) * 0.7,
+        'trending_score', get_item_recent_vote_sum(p_item_id, 7)
+    )
+    INTO v_analytics
+    FROM item_statistics s
+    JOIN items i ON i.id = s.item_id
+    WHERE s.item_id = p_item_id;
+    
+    RETURN v_analytics;
+END;
+$$ language 'plpgsql';
+
+-- Full-text search over item name and description. The service queries it via
+-- PostgREST's fts filter with prefix (:*) terms, which can use the GIN index unlike a
+-- leading-wildcard ilike
+ALTER TABLE items ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        to_tsvector('simple', COALESCE(name, '') || ' ' || COALESCE(description, ''))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS items_search_idx ON items USING GIN(search_vector);
@@ -1,14 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from routes import api_router
+from routes.wiki import listen_for_duplicate_invalidations
+from service.top_item import top_items_service
 from config.logging_config import setup_logging, get_safe_logger
 
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from fastapi_cache.backends.inmemory import InMemoryBackend
 import redis.asyncio as redis
+import asyncio
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 setup_logging(
     log_level=os.getenv("LOG_LEVEL", "INFO"),
@@ -16,9 +20,38 @@ setup_logging(
 
 logger = get_safe_logger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize response cache - Redis when configured, in-memory otherwise"""
+    redis_url = os.getenv("REDIS_URL")
+    invalidation_task = None
+    if redis_url:
+        redis_client = redis.from_url(redis_url)
+        FastAPICache.init(RedisBackend(redis_client), prefix="nene-cache")
+        # Keep per-worker duplicate caches in sync when items are created
+        invalidation_task = asyncio.create_task(listen_for_duplicate_invalidations(redis_client))
+        logger.info("Response cache initialized with Redis backend")
+    else:
+        redis_client = None
+        FastAPICache.init(InMemoryBackend(), prefix="nene-cache")
+        logger.info("Response cache initialized with in-memory backend")
+    
+    yield
+    
+    if invalidation_task is not None:
+        invalidation_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await invalidation_task
+    if redis_client is not None:
+        await redis_client.close()
+    # Release the items service's pooled PostgREST connections
+    top_items_service.close()
+
 app = FastAPI(
     title="Top50 service API",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -31,10 +64,14 @@ app.include_router(
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure this properly for production
+    # Comma-separated list of allowed origins, a local frontend by default - browsers
+    # reject credentialed responses to a wildcard origin
+    allow_origins=[origin.strip() for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")],
     allow_credentials=True,
-    allow_methods=["*"],
+    # Item/list routes update and delete as well as read and create
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
     allow_headers=["*"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
 @app.get("/")
@@ -49,4 +86,26 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvloop isn't available on Windows, fall back to the default asyncio loop
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "auto"
+    # In-process caches (in-memory FastAPICache, duplicate/item/research caches) are
+    # per worker and only invalidated across workers through Redis - without it run one
+    default_workers = "2" if os.getenv("REDIS_URL") else "1"
+    # Multiple workers require an import string instead of the app object
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        loop=loop,
+        http=http,
+        workers=int(os.getenv("WEB_CONCURRENCY", default_workers)),
+    )
\ No newline at end of file
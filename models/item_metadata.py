@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from models.top_models.enums import CategoryEnum
 
@@ -25,16 +25,16 @@ class ItemMetadataResponse(BaseModel):
     # Enhanced metadata
     reference_url: Optional[str] = None
     image_url: Optional[str] = None
-    additional_metadata: Dict[str, Any] = {}
+    additional_metadata: Dict[str, Any] = Field(default_factory=dict)
     
     # Research quality indicators
     confidence_score: int = 0
-    sources_used: List[str] = []
+    sources_used: List[str] = Field(default_factory=list)
     research_timestamp: str
     
 class MetadataValidationResult(BaseModel):
     """Result of metadata validation"""
     is_valid: bool
     confidence: int
-    issues: List[str] = []
-    suggestions: List[str] = []
\ No newline at end of file
+    issues: List[str] = Field(default_factory=list)
+    suggestions: List[str] = Field(default_factory=list)
\ No newline at end of file
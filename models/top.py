@@ -50,11 +50,13 @@ class ItemBase(BaseModel):
     item_year: Optional[int] = Field(None, ge=1800, le=2030)
 
 class ItemCreate(ItemBase):
-    tags: Optional[List[str]] = []
-    accolades: Optional[List[AccoladeBase]] = []
-    reference_url: Optional[str] = None
+    tags: Optional[List[str]] = Field(default_factory=list)
+    accolades: Optional[List[AccoladeBase]] = Field(default_factory=list)
     item_year_to: Optional[int] = None
 
+    class Config:
+        frozen = True
+
 class ItemUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=255)
     category: Optional[CategoryEnum] = None
@@ -64,6 +66,9 @@ class ItemUpdate(BaseModel):
     description: Optional[str] = None
     item_year: Optional[int] = Field(None, ge=1800, le=2030)
 
+    class Config:
+        frozen = True
+
 class ItemResponse(ItemBase):
     id: uuid.UUID
     image_url: Optional[str]
@@ -71,8 +76,8 @@ class ItemResponse(ItemBase):
     selection_count: int = 0
     created_at: datetime
     updated_at: datetime
-    accolades: List[AccoladeResponse] = []
-    tags: List[TagResponse] = []
+    accolades: List[AccoladeResponse] = Field(default_factory=list)
+    tags: List[TagResponse] = Field(default_factory=list)
     
 
     class Config:
@@ -116,7 +121,8 @@ class UserVoteBase(BaseModel):
     vote_value: VoteValue
 
 class UserVoteCreate(UserVoteBase):
-    pass
+    class Config:
+        frozen = True
 
 class UserVoteResponse(UserVoteBase):
     id: uuid.UUID
@@ -166,7 +172,7 @@ class ListItemWithDetails(BaseModel):
 
 
 class ListWithItems(ListResponse):
-    items: List[ListItemWithDetails] = []
+    items: List[ListItemWithDetails] = Field(default_factory=list)
     total_items: int = 0
     follower_count: int = 0
     comment_count: int = 0
@@ -200,12 +206,19 @@ class ItemSearchFilters(BaseModel):
     category: Optional[CategoryEnum] = None
     subcategory: Optional[str] = None
     search_query: Optional[str] = None
-    tags: Optional[List[str]] = []
+    tags: Optional[List[str]] = Field(default_factory=list)
     year_from: Optional[int] = None
     year_to: Optional[int] = None
     min_appearances: Optional[int] = None
     sort_by: Optional[str] = Field("name", pattern="^(name|popularity|recent|ranking)$")
 
+    @validator('category', pre=True)
+    def normalize_category(cls, v):
+        # Services read filters.category.value directly, so it must always arrive as the enum
+        if isinstance(v, str) and not isinstance(v, CategoryEnum):
+            return CategoryEnum(v.strip().lower())
+        return v
+
 class ItemAnalyticsResponse(BaseModel):
     item_id: uuid.UUID
     total_appearances: int
@@ -226,7 +239,7 @@ class ItemAnalyticsResponse(BaseModel):
 class AdvancedItemSearchFilters(ItemSearchFilters):
     min_popularity: Optional[int] = None
     has_accolades: Optional[bool] = None
-    accolade_types: Optional[List[AccoladeType]] = []
+    accolade_types: Optional[List[AccoladeType]] = Field(default_factory=list)
     min_appearances: Optional[int] = None
     ranking_position_filter: Optional[str] = None  # "top_10", "top_3", "first_place"
 
@@ -1,7 +1,14 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List
+from fastapi.encoders import jsonable_encoder
+from typing import Optional, List, Dict, Any
+import asyncio
+import json
 import logging
-from pydantic import BaseModel
+import sys
+from cachetools import TTLCache
+from pydantic import BaseModel, Field, validator
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
 
 from models.top import ItemResponse
 from models.top_models.enums import CategoryEnum, DuplicateAction, ResearchDepth
@@ -11,6 +18,14 @@ from services.top.item_validation_service import item_validation_service
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["item-research"])
 
+# LLM + web research is slow and repeatable, cache finished results for an hour
+RESEARCH_CACHE_EXPIRE = 3600
+
+# Duplicate checks: in-process TTL cache in front of the shared cache backend
+DUPLICATE_CACHE_TTL = 60
+DUPLICATE_INVALIDATE_CHANNEL = "items:invalidate"
+_duplicate_cache: TTLCache = TTLCache(maxsize=10_000, ttl=DUPLICATE_CACHE_TTL)
+
 class ItemResearchRequest(BaseModel):
     """Enhanced request model for item research with duplicate handling"""
     name: str
@@ -22,12 +37,26 @@ class ItemResearchRequest(BaseModel):
     research_depth: ResearchDepth = ResearchDepth.standard
     duplicate_action: DuplicateAction = DuplicateAction.reject
 
+    class Config:
+        frozen = True
+
+    @validator('name', pre=True)
+    def normalize_name(cls, v):
+        """Strip and intern once at parse time - the name is reused in cache keys"""
+        return sys.intern(v.strip()) if isinstance(v, str) else v
+
+    @validator('subcategory', pre=True)
+    def normalize_subcategory(cls, v):
+        """Strip and intern only - case is kept as given so stored subcategories still match
+        existing rows under unique_item; cache keys case-fold on their own"""
+        return sys.intern(v.strip()) if isinstance(v, str) else v
+
 class DuplicateInfo(BaseModel):
     """Information about duplicate items found"""
     is_duplicate: bool
     duplicate_count: int
-    existing_items: List[ItemResponse] = []
-    similarity_scores: List[float] = []
+    existing_items: List[ItemResponse] = Field(default_factory=list)
+    similarity_scores: List[float] = Field(default_factory=list)
     exact_match: bool = False
 
 class ItemResearchResponse(BaseModel):
@@ -38,7 +67,7 @@ class ItemResearchResponse(BaseModel):
     
     # Validation results
     is_valid: bool = True
-    validation_errors: List[str] = []
+    validation_errors: List[str] = Field(default_factory=list)
     
     # Duplicate information
     duplicate_info: DuplicateInfo
@@ -56,12 +85,117 @@ class ItemResearchResponse(BaseModel):
     llm_confidence: int = 0
     web_sources_found: int = 0
     research_method: str = "none"
-    research_errors: List[str] = []
+    research_errors: List[str] = Field(default_factory=list)
     
     # Auto-creation result
     item_created: bool = False
     item_id: Optional[str] = None
 
+def _research_cache_key(request: ItemResearchRequest) -> Optional[str]:
+    """Cache key for a research request, None when the request has side effects"""
+    if request.auto_create or request.allow_duplicate:
+        return None
+    return (
+        f"{FastAPICache.get_prefix()}:research:{request.name}|{request.category.value}|"
+        f"{request.subcategory}|{request.research_depth.value}|{request.user_provided_description or ''}"
+    )
+
+async def _get_cached_research(key: str) -> Optional[Dict[str, Any]]:
+    """Return cached research fields (everything but duplicate_info), cache problems are never fatal"""
+    try:
+        cached = await FastAPICache.get_backend().get(key)
+        if cached:
+            return json.loads(cached)
+    except Exception as e:
+        logger.warning("Research cache read failed for %s: %s", key, e)
+    return None
+
+async def _set_cached_research(key: str, response: ItemResearchResponse) -> None:
+    """Store research response in cache. duplicate_info is left out - it goes stale as soon
+    as a matching item is created, so every hit recomputes it"""
+    try:
+        await FastAPICache.get_backend().set(
+            key, response.model_dump_json(exclude={'duplicate_info'}).encode(), expire=RESEARCH_CACHE_EXPIRE
+        )
+    except Exception as e:
+        logger.warning("Research cache write failed for %s: %s", key, e)
+
+def _build_duplicate_info(duplicate_result: Dict[str, Any]) -> DuplicateInfo:
+    return DuplicateInfo(
+        is_duplicate=duplicate_result['is_duplicate'],
+        duplicate_count=duplicate_result['duplicate_count'],
+        existing_items=duplicate_result.get('existing_items', []),
+        similarity_scores=duplicate_result.get('similarity_scores', []),
+        exact_match=duplicate_result.get('exact_match', False)
+    )
+
+def _duplicate_cache_key(name: str, category: CategoryEnum, subcategory: str) -> str:
+    """Normalized key shared by the local and backend duplicate caches"""
+    return f"{name.lower().strip()}|{category.value}|{subcategory.lower().strip()}"
+
+async def _check_duplicates_cached(name: str, category: CategoryEnum, subcategory: str) -> Dict[str, Any]:
+    """
+    Duplicate check with two cache tiers:
+    1. In-process TTLCache (no network)
+    2. Shared FastAPICache backend (Redis in production)
+    3. Database via item_validation_service
+    """
+    key = _duplicate_cache_key(name, category, subcategory)
+    cached = _duplicate_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    backend_key = f"{FastAPICache.get_prefix()}:duplicates:{key}"
+    try:
+        backend_value = await FastAPICache.get_backend().get(backend_key)
+        if backend_value:
+            result = json.loads(backend_value)
+            _duplicate_cache[key] = result
+            return result
+    except Exception as e:
+        logger.warning("Duplicate cache read failed for %s: %s", key, e)
+    
+    result = jsonable_encoder(await item_validation_service.check_duplicates(name, category, subcategory))
+    _duplicate_cache[key] = result
+    try:
+        await FastAPICache.get_backend().set(
+            backend_key, json.dumps(result).encode(), expire=DUPLICATE_CACHE_TTL
+        )
+    except Exception as e:
+        logger.warning("Duplicate cache write failed for %s: %s", key, e)
+    return result
+
+async def invalidate_duplicate_cache(name: str, category: CategoryEnum, subcategory: str) -> None:
+    """Drop cached duplicate checks for an item and notify other workers"""
+    key = _duplicate_cache_key(name, category, subcategory)
+    _duplicate_cache.pop(key, None)
+    backend_key = f"{FastAPICache.get_prefix()}:duplicates:{key}"
+    try:
+        backend = FastAPICache.get_backend()
+        if isinstance(backend, RedisBackend):
+            await backend.redis.delete(backend_key)
+            await backend.redis.publish(DUPLICATE_INVALIDATE_CHANNEL, key)
+        elif await backend.get(backend_key) is not None:
+            await backend.clear(key=backend_key)
+    except Exception as e:
+        logger.warning("Duplicate cache invalidation failed for %s: %s", key, e)
+
+async def listen_for_duplicate_invalidations(redis_client) -> None:
+    """Evict local duplicate cache entries invalidated by other workers"""
+    pubsub = redis_client.pubsub()
+    await pubsub.subscribe(DUPLICATE_INVALIDATE_CHANNEL)
+    try:
+        async for message in pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            key = message["data"]
+            if isinstance(key, bytes):
+                key = key.decode()
+            _duplicate_cache.pop(key, None)
+    finally:
+        await pubsub.unsubscribe(DUPLICATE_INVALIDATE_CHANNEL)
+        await pubsub.close()
+
 @router.post("/", response_model=ItemResearchResponse)
 async def research_item_metadata(request: ItemResearchRequest) -> ItemResearchResponse:
     """
@@ -74,50 +208,80 @@ async def research_item_metadata(request: ItemResearchRequest) -> ItemResearchRe
     4. If duplicates found and allow_duplicate=True, proceed with research
     5. Perform LLM + Web research
     6. Optionally auto-create item
+    
+    Requests without side effects (no auto_create / allow_duplicate) are
+    served from the response cache when possible.
     """
     try:
-        logger.info(f"Starting item research for: {request.name} ({request.category.value}/{request.subcategory})")
+        logger.info("Starting item research for: %s (%s/%s)", request.name, request.category.value, request.subcategory)
+        
+        cache_key = _research_cache_key(request)
+        if cache_key:
+            cached_fields = await _get_cached_research(cache_key)
+            if cached_fields:
+                # Duplicate status is recomputed on every hit - once a duplicate exists,
+                # fall through so the normal flow blocks the request
+                duplicate_result = await _check_duplicates_cached(
+                    request.name, request.category, request.subcategory
+                )
+                if not duplicate_result['is_duplicate']:
+                    logger.info("Serving cached research for %s", request.name)
+                    return ItemResearchResponse(
+                        **cached_fields,
+                        duplicate_info=_build_duplicate_info(duplicate_result)
+                    )
+        
+        # Request-derived fields shared by every response branch
+        base_fields = {
+            "name": request.name,
+            "category": request.category,
+            "subcategory": request.subcategory,
+        }
         
-        # Step 1: Basic validation
-        validation_result = await item_validation_service.validate_item_request(
+        # Step 1 + 2: Basic validation and duplicate check are independent, run together.
+        # Trivially empty input skips the duplicate query, validation will reject it.
+        validate_coro = item_validation_service.validate_item_request(
             name=request.name,
             category=request.category,
             subcategory=request.subcategory
         )
+        duplicate_result = None
+        if request.name and request.subcategory:
+            validation_result, duplicate_result = await asyncio.gather(
+                validate_coro,
+                item_validation_service.check_duplicates(
+                    name=request.name,
+                    category=request.category,
+                    subcategory=request.subcategory
+                )
+            )
+        else:
+            validation_result = await validate_coro
         
         if not validation_result['is_valid']:
-            return ItemResearchResponse(
-                name=request.name,
-                category=request.category,
-                subcategory=request.subcategory,
+            # Early exits only carry already-validated values, skip revalidation
+            return ItemResearchResponse.model_construct(
+                **base_fields,
                 is_valid=False,
                 validation_errors=validation_result['errors'],
                 duplicate_info=DuplicateInfo(is_duplicate=False, duplicate_count=0),
                 research_performed=False
             )
         
-        # Step 2: Check for duplicates
-        duplicate_result = await item_validation_service.check_duplicates(
-            name=request.name,
-            category=request.category,
-            subcategory=request.subcategory
-        )
+        if duplicate_result is None:
+            duplicate_result = await item_validation_service.check_duplicates(
+                name=request.name,
+                category=request.category,
+                subcategory=request.subcategory
+            )
         
-        duplicate_info = DuplicateInfo(
-            is_duplicate=duplicate_result['is_duplicate'],
-            duplicate_count=duplicate_result['duplicate_count'],
-            existing_items=duplicate_result.get('existing_items', []),
-            similarity_scores=duplicate_result.get('similarity_scores', []),
-            exact_match=duplicate_result.get('exact_match', False)
-        )
+        duplicate_info = _build_duplicate_info(duplicate_result)
         
         # Step 3: Handle duplicate policy
         if duplicate_info.is_duplicate and not request.allow_duplicate:
-            logger.info(f"Duplicate found for {request.name}, blocking research (allow_duplicate=False)")
-            return ItemResearchResponse(
-                name=request.name,
-                category=request.category,
-                subcategory=request.subcategory,
+            logger.info("Duplicate found for %s, blocking research (allow_duplicate=False)", request.name)
+            return ItemResearchResponse.model_construct(
+                **base_fields,
                 is_valid=True,
                 duplicate_info=duplicate_info,
                 research_performed=False,
@@ -126,7 +290,7 @@ async def research_item_metadata(request: ItemResearchRequest) -> ItemResearchRe
             )
         
         # Step 4: Perform research (if allowed or no duplicates)
-        logger.info(f"Performing research for {request.name} (duplicates: {duplicate_info.duplicate_count}, allowed: {request.allow_duplicate})")
+        logger.info("Performing research for %s (duplicates: %s, allowed: %s)", request.name, duplicate_info.duplicate_count, request.allow_duplicate)
         
         research_result = await item_metadata_service.research_item_metadata(
             name=request.name,
@@ -138,9 +302,7 @@ async def research_item_metadata(request: ItemResearchRequest) -> ItemResearchRe
         
         # Build response with research results
         response = ItemResearchResponse(
-            name=request.name,
-            category=request.category,
-            subcategory=request.subcategory,
+            **base_fields,
             is_valid=True,
             duplicate_info=duplicate_info,
             research_performed=True,
@@ -172,15 +334,20 @@ async def research_item_metadata(request: ItemResearchRequest) -> ItemResearchRe
                 if created_item:
                     response.item_created = True
                     response.item_id = str(created_item.id)
-                    logger.info(f"Auto-created item: {created_item.name} ({created_item.id})")
+                    await invalidate_duplicate_cache(request.name, request.category, request.subcategory)
+                    logger.info("Auto-created item: %s (%s)", created_item.name, created_item.id)
                 
             except Exception as create_error:
-                logger.warning(f"Auto-creation failed for {request.name}: {create_error}")
+                logger.warning("Auto-creation failed for %s: %s", request.name, create_error)
                 response.research_errors.append(f"Auto-creation failed: {str(create_error)}")
         elif request.auto_create and duplicate_info.exact_match:
             response.research_errors.append("Auto-creation blocked: exact duplicate found")
         
-        logger.info(f"Item research completed for {request.name} (confidence: {response.llm_confidence}%)")
+        logger.info("Item research completed for %s (confidence: %s%%)", request.name, response.llm_confidence)
+        
+        if cache_key:
+            await _set_cached_research(cache_key, response)
+        
         return response
         
     except Exception as e:
@@ -212,7 +379,7 @@ async def validate_item_only(
         
         # Add duplicate check if requested
         if check_duplicates:
-            duplicate_result = await item_validation_service.check_duplicates(name, category, subcategory)
+            duplicate_result = await _check_duplicates_cached(name, category, subcategory)
             response['duplicate_info'] = DuplicateInfo(
                 is_duplicate=duplicate_result['is_duplicate'],
                 duplicate_count=duplicate_result['duplicate_count'],
@@ -223,5 +390,5 @@ async def validate_item_only(
         return response
         
     except Exception as e:
-        logger.error(f"Validation failed for {name}: {e}")
+        logger.error("Validation failed for %s: %s", name, e)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
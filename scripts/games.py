@@ -1,13 +1,38 @@
 import csv
 import asyncio
+import heapq
 import sys
 import os
 import re
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
 from typing import List, Dict, Any, Optional
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import orjson
 
+# pandas' C parser is much faster than csv.DictReader, but stays optional
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
+
+## python -m scripts.games  (run from the repo root so config/ resolves)
 from config.database_top import supabase
+from config.postgres import get_pg_pool
+
+# Name cleanup rules applied in a single regex scan (pattern -> replacement)
+_NAME_REPLACEMENTS = {
+    '""': '"',  # CSV-escaped double quotes
+}
+_NAME_REPLACEMENTS_RE = re.compile('|'.join(re.escape(pattern) for pattern in _NAME_REPLACEMENTS))
+
+GAME_CSV_COLUMNS = ["Name", "item_year", "Group", "Description", "Meta - Users", "Meta - Critics", "Game of the year"]
+CSV_CHUNK_SIZE = 5000
+INSERT_BATCH_SIZE = 500  # rows per PostgREST insert, keeps payloads under request limits
+INSERT_CONCURRENCY = 16
 
 class GameDataProcessor:
     """Process and import games data with proper accolade handling"""
@@ -15,9 +40,17 @@ class GameDataProcessor:
     @staticmethod
     def parse_metacritic_score(score_str: str) -> Optional[int]:
         """Parse metacritic score, handling empty values"""
-        if not score_str or score_str.strip() == '':
+        if not score_str:
+            return None
+        score_str = score_str.strip()
+        if not score_str:
             return None
         
+        # Integer scores are the common case - skip the float round trip
+        if score_str.isdecimal():
+            score = int(score_str)
+            return score * 10 if score <= 10 else score
+        
         try:
             score = float(score_str)
             # Convert user scores (0-10) to 0-100 scale
@@ -29,98 +62,401 @@ class GameDataProcessor:
             return None
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def clean_game_name(name: str) -> str:
         """Clean game name for consistency"""
         # Remove extra quotes and normalize spacing
-        return name.strip().replace('""', '"')
+        return _NAME_REPLACEMENTS_RE.sub(lambda match: _NAME_REPLACEMENTS[match.group(0)], name.strip())
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize_developer(developer: str) -> str:
         """Normalize developer names"""
         if not developer:
             return "Unknown Developer"
-        return developer.strip()
+        # Developer/group values repeat across rows - share one string object
+        return sys.intern(developer.strip())
 
-async def create_game_with_accolades(
-    name: str,
-    item_year: int,
-    group: str,
-    description: str,
+def build_game_item(name: str, item_year: int, group: str, description: str) -> Dict[str, Any]:
+    """Build the items row for a game"""
+    return {
+        "name": GameDataProcessor.clean_game_name(name),
+        "category": "games",
+        "subcategory": "video_games",
+        "group": GameDataProcessor.normalize_developer(group),
+        "description": description,
+        "item_year": item_year
+    }
+
+def build_game_accolades(
     meta_users: Optional[str],
     meta_critics: Optional[str],
     goty: Optional[str]
-) -> bool:
-    """Create a game item with its accolades"""
+) -> List[Dict[str, str]]:
+    """Build accolade rows for a game, item_id is filled in after the item insert"""
+    accolades = []
     
-    try:
-        # Clean and prepare data
-        clean_name = GameDataProcessor.clean_game_name(name)
-        clean_group = GameDataProcessor.normalize_developer(group)
+    # Metacritic Users accolade
+    users_score = GameDataProcessor.parse_metacritic_score(meta_users)
+    if users_score is not None:
+        accolades.append({
+            "type": "metacritic_users",
+            "name": "Metacritic Users",
+            "value": str(users_score)
+        })
+    
+    # Metacritic Critics accolade
+    critics_score = GameDataProcessor.parse_metacritic_score(meta_critics)
+    if critics_score is not None:
+        accolades.append({
+            "type": "metacritic_critics",
+            "name": "Metacritic Critics",
+            "value": str(critics_score)
+        })
+    
+    # Game of the Year accolade
+    if goty and goty.strip().lower() == "winner":
+        accolades.append({
+            "type": "goty",
+            "name": "Game of the Year",
+            "value": "Winner"
+        })
+    
+    return accolades
+
+def build_game(
+    name: str,
+    item_year: int,
+    group: str,
+    genre: str,
+    accolades: List[Dict[str, str]]
+) -> Dict[str, Any]:
+    """Build the item payload for one CSV row and attach its accolade rows"""
+    description = f"Video game developed by {group} in {item_year}"
+    if genre:
+        description += f". Genre: {genre}"
+    
+    return {
+        'item': build_game_item(name=name, item_year=item_year, group=group, description=description),
+        'accolades': accolades
+    }
+
+def read_games_csv(csv_path: str) -> List[Dict[str, Any]]:
+    """Parse the games CSV into item/accolade payloads, using pandas when available"""
+    if pd is not None:
+        return _read_games_csv_pandas(csv_path)
+    return _read_games_csv_stdlib(csv_path)
+
+def _read_games_csv_pandas(csv_path: str) -> List[Dict[str, Any]]:
+    """Chunked pandas reader with vectorized row validation"""
+    games = []
+    # keep_default_na=False keeps empty cells as '' - same values csv.DictReader yields
+    reader = pd.read_csv(
+        csv_path,
+        usecols=GAME_CSV_COLUMNS,
+        dtype=str,
+        keep_default_na=False,
+        encoding='utf-8',
+        chunksize=CSV_CHUNK_SIZE
+    )
+    
+    for chunk in reader:
+        chunk = chunk[GAME_CSV_COLUMNS]  # usecols keeps file order, fix it for unpacking
+        years = pd.to_numeric(chunk["item_year"], errors="coerce")
+        valid = chunk["Name"].ne("") & years.notna() & (years % 1 == 0)
         
-        # Create the game item
-        item_response = supabase.table("items").insert({
-            "name": clean_name,
-            "category": "games",
-            "subcategory": "video_games",
-            "group": clean_group,
-            "description": description,
-            "item_year": item_year
-        }).execute()
+        skipped = int((~valid).sum())
+        if skipped:
+            print(f"⚠ Skipping {skipped} rows with missing or invalid name/year")
         
-        if not item_response.data:
-            print(f"✗ Failed to create game: {clean_name}")
-            return False
+        chunk = chunk[valid]
         
-        item = item_response.data[0]
-        item_id = item['id']
-        accolades_created = 0
+        # Vectorized metacritic parsing - user scores (0-10) scaled to 0-100,
+        # truncated like GameDataProcessor.parse_metacritic_score
+        users = pd.to_numeric(chunk["Meta - Users"], errors="coerce")
+        critics = pd.to_numeric(chunk["Meta - Critics"], errors="coerce")
+        users = np.trunc(np.where(users <= 10, users * 10, users))
+        critics = np.trunc(np.where(critics <= 10, critics * 10, critics))
+        goty_winners = chunk["Game of the year"].str.strip().str.lower().eq("winner").to_numpy()
         
-        # Create Metacritic Users accolade
-        users_score = GameDataProcessor.parse_metacritic_score(meta_users)
-        if users_score is not None:
-            users_response = supabase.table("accolades").insert({
-                "item_id": item_id,
-                "type": "metacritic_users",
-                "name": "Metacritic Users",
-                "value": str(users_score)
-            }).execute()
+        for (name, _, group, genre, _, _, _), item_year, users_score, critics_score, goty_winner in zip(
+            chunk.itertuples(index=False, name=None),
+            years[valid].astype(int),
+            users,
+            critics,
+            goty_winners
+        ):
+            accolades = []
+            if not np.isnan(users_score):
+                accolades.append({"type": "metacritic_users", "name": "Metacritic Users", "value": str(int(users_score))})
+            if not np.isnan(critics_score):
+                accolades.append({"type": "metacritic_critics", "name": "Metacritic Critics", "value": str(int(critics_score))})
+            if goty_winner:
+                accolades.append({"type": "goty", "name": "Game of the Year", "value": "Winner"})
             
-            if users_response.data:
-                accolades_created += 1
+            games.append(build_game(name, int(item_year), group, genre, accolades))
+    
+    return games
+
+def _read_games_csv_stdlib(csv_path: str) -> List[Dict[str, Any]]:
+    """csv module fallback when pandas isn't installed"""
+    games = []
+    # Per-row warnings are buffered and written once - stdout is line-buffered
+    warnings = []
+    
+    with open(csv_path, 'r', encoding='utf-8') as file:
+        # csv.reader yields plain lists - no per-row dict like DictReader
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return games
         
-        # Create Metacritic Critics accolade
-        critics_score = GameDataProcessor.parse_metacritic_score(meta_critics)
-        if critics_score is not None:
-            critics_response = supabase.table("accolades").insert({
-                "item_id": item_id,
-                "type": "metacritic_critics", 
-                "name": "Metacritic Critics",
-                "value": str(critics_score)
-            }).execute()
-            
-            if critics_response.data:
-                accolades_created += 1
+        # Resolve column positions once; a missing column fails like pandas' usecols
+        column_index = {column: i for i, column in enumerate(header)}
+        pick_columns = itemgetter(*(column_index[column] for column in GAME_CSV_COLUMNS))
+        width = len(header)
         
-        # Create Game of the Year accolade
-        if goty and goty.strip().lower() == "winner":
-            goty_response = supabase.table("accolades").insert({
-                "item_id": item_id,
-                "type": "goty",
-                "name": "Game of the Year",
-                "value": "Winner"
-            }).execute()
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row += [''] * (width - len(row))
+            name, raw_year, group, genre, meta_users, meta_critics, goty = pick_columns(row)
+            
+            # Skip rows with missing essential data
+            raw_year = raw_year.strip()
+            if not name or not raw_year:
+                warnings.append(f"⚠ Skipping row with missing data: {dict(zip(header, row))}")
+                continue
             
-            if goty_response.data:
-                accolades_created += 1
+            # Branch on isdecimal() instead of catching int() errors for bad years -
+            # a single leading minus is allowed, "--5" is not
+            if not (raw_year[1:] if raw_year.startswith('-') else raw_year).isdecimal():
+                warnings.append(f"⚠ Invalid year for {name}: {raw_year}")
+                continue
+            item_year = int(raw_year)
+            
+            games.append(build_game(
+                name=name,
+                item_year=item_year,
+                group=group,
+                genre=genre,
+                accolades=build_game_accolades(
+                    meta_users=meta_users,
+                    meta_critics=meta_critics,
+                    goty=goty
+                )
+            ))
+    
+    if warnings:
+        sys.stdout.write("\n".join(warnings) + "\n")
+    
+    return games
+
+def _insert_rows(table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Bulk insert through the client's PostgREST session, returns the inserted rows"""
+    # Serialize the whole batch once with orjson instead of the builder's stdlib json
+    response = supabase.postgrest.session.post(
+        f"/{table}",
+        content=orjson.dumps(rows),
+        headers={"Content-Type": "application/json", "Prefer": "return=representation"}
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content) or []
+
+def _insert_accolades(accolades_payload: List[Dict[str, Any]]) -> int:
+    """Insert accolade rows for items that already exist - returns the number created.
+    A failed bulk insert is retried per item so the items are never inserted twice"""
+    if not accolades_payload:
+        return 0
+    
+    try:
+        return len(_insert_rows("accolades", accolades_payload))
+    except Exception as e:
+        print(f"⚠ Accolades batch of {len(accolades_payload)} failed, retrying item by item: {e}")
+    
+    accolades_by_item = {}
+    for accolade in accolades_payload:
+        accolades_by_item.setdefault(accolade['item_id'], []).append(accolade)
+    
+    accolades_created = 0
+    for item_id, item_accolades in accolades_by_item.items():
+        try:
+            accolades_created += len(_insert_rows("accolades", item_accolades))
+        except Exception as e:
+            print(f"✗ Skipping accolades for item {item_id}: {e}")
+    return accolades_created
+
+def _insert_games_batch(games: List[Dict[str, Any]]) -> tuple:
+    """Insert one batch of items, then its accolades - returns (games, accolades) created.
+    Only a failed items insert raises; accolade failures are handled by _insert_accolades"""
+    # PostgREST returns inserted rows in insert order
+    created_items = _insert_rows("items", [game['item'] for game in games])
+    
+    if not created_items:
+        return 0, 0
+    
+    # Map returned ids onto accolade rows and insert them in one round trip
+    accolades_payload = [
+        {**accolade, "item_id": item['id']}
+        for game, item in zip(games, created_items)
+        for accolade in game['accolades']
+    ]
+    
+    return len(created_items), _insert_accolades(accolades_payload)
+
+def _insert_games_one_by_one(games: List[Dict[str, Any]]) -> tuple:
+    """Fallback for a failed items insert - insert each game alone so one bad row
+    (e.g. a unique_item conflict) only skips that game"""
+    games_created = accolades_created = 0
+    for game in games:
+        try:
+            created, accolades = _insert_games_batch([game])
+        except Exception as e:
+            print(f"✗ Skipping game {game['item']['name']}: {e}")
+            continue
+        games_created += created
+        accolades_created += accolades
+    return games_created, accolades_created
+
+async def create_games_with_accolades(games: List[Dict[str, Any]]) -> int:
+    """
+    Create game items and their accolades with bulk inserts.
+    Each entry holds an `item` row and its `accolades` rows. Large imports are
+    split into batches that are submitted concurrently (bounded by a semaphore).
+    Returns the number of games created.
+    """
+    if not games:
+        return 0
+    
+    semaphore = asyncio.Semaphore(INSERT_CONCURRENCY)
+    
+    async def insert_batch(batch: List[Dict[str, Any]]) -> tuple:
+        async with semaphore:
+            try:
+                # supabase client is synchronous - run in a thread so batches overlap
+                return await asyncio.to_thread(_insert_games_batch, batch)
+            except Exception as e:
+                # Only the items insert raises here, so nothing from this batch was created
+                print(f"⚠ Games batch of {len(batch)} failed, retrying game by game: {e}")
+                return await asyncio.to_thread(_insert_games_one_by_one, batch)
+    
+    results = await asyncio.gather(*[
+        insert_batch(games[i:i + INSERT_BATCH_SIZE])
+        for i in range(0, len(games), INSERT_BATCH_SIZE)
+    ])
+    
+    games_created = sum(created for created, _ in results)
+    accolades_created = sum(accolades for _, accolades in results)
+    
+    if not games_created:
+        print("✗ Failed to create games")
+    else:
+        print(f"✓ Created {games_created} games with {accolades_created} accolades")
+    return games_created
+
+async def create_games_with_accolades_pg(pool, games: List[Dict[str, Any]]) -> int:
+    """
+    Direct Postgres variant of create_games_with_accolades - items via one
+    unnest() insert, accolades via COPY, both in a single transaction.
+    Returns the number of games created.
+    """
+    if not games:
+        return 0
+    
+    items = [game['item'] for game in games]
+    
+    try:
+        async with pool.acquire() as con:
+            async with con.transaction():
+                rows = await con.fetch(
+                    '''
+                    INSERT INTO items (name, category, subcategory, "group", description, item_year)
+                    SELECT * FROM unnest($1::text[], $2::category_enum[], $3::text[], $4::text[], $5::text[], $6::int[])
+                    ON CONFLICT ON CONSTRAINT unique_item DO NOTHING
+                    RETURNING id, name
+                    ''',
+                    [item['name'] for item in items],
+                    [item['category'] for item in items],
+                    [item['subcategory'] for item in items],
+                    [item['group'] for item in items],
+                    [item['description'] for item in items],
+                    [item['item_year'] for item in items],
+                )
+                
+                # Names are unique within games/video_games (unique_item constraint).
+                # Games that already existed were skipped above and get no accolades
+                ids_by_name = {row['name']: row['id'] for row in rows}
+                accolade_records = [
+                    (ids_by_name[game['item']['name']], accolade['type'], accolade['name'], accolade['value'])
+                    for game in games
+                    if game['item']['name'] in ids_by_name
+                    for accolade in game['accolades']
+                ]
+                
+                if accolade_records:
+                    await con.copy_records_to_table(
+                        "accolades",
+                        records=accolade_records,
+                        columns=("item_id", "type", "name", "value")
+                    )
         
-        print(f"✓ Created game: {clean_name} ({clean_group}, {item_year}) with {accolades_created} accolades")
-        return True
+        skipped = len(items) - len(rows)
+        if skipped:
+            print(f"⚠ Skipped {skipped} games that already exist")
+        print(f"✓ Created {len(rows)} games with {len(accolade_records)} accolades (direct Postgres)")
+        return len(rows)
         
     except Exception as e:
-        print(f"✗ Error creating game {name}: {e}")
-        return False
+        print(f"✗ Error creating games via Postgres: {e}")
+        return 0
+
+def _fetch_top_games(limit: int) -> List[Dict[str, Any]]:
+    """Top games by composite score, ranked server-side by the top_games RPC"""
+    try:
+        response = supabase.rpc("top_games", {"n": limit}).execute()
+        if response.data is not None:
+            return response.data
+    except Exception as e:
+        # Function not installed yet (data/top_extension_2.sql) - rank locally
+        print(f"⚠ top_games RPC unavailable, ranking in Python: {e}")
+    return _rank_top_games_locally(limit)
+
+def _rank_top_games_locally(limit: int) -> List[Dict[str, Any]]:
+    """Fallback ranking: fetch games and their accolades, score and sort in Python"""
+    games_response = supabase.table("items").select("id").eq("category", "games").execute()
+    
+    if not games_response.data:
+        return []
+    
+    # Fetch accolades for all games in one query instead of one per game
+    game_ids = [game['id'] for game in games_response.data]
+    accolades_response = supabase.table("accolades").select("item_id,type,value").in_("item_id", game_ids).execute()
+    
+    # [critics, users, goty_bonus] per game, built in a single pass
+    scores = {}
+    for accolade in accolades_response.data or []:
+        score = scores.setdefault(accolade['item_id'], [0, 0, 0])
+        try:
+            if accolade['type'] == 'metacritic_critics':
+                score[0] = int(accolade['value'])
+            elif accolade['type'] == 'metacritic_users':
+                score[1] = int(accolade['value'])
+            elif accolade['type'] == 'goty':
+                score[2] = 10  # GOTY bonus
+        except (ValueError, TypeError):
+            continue
+    
+    # Weighted score: 60% critics, 40% users, plus GOTY bonus
+    composite = {
+        item_id: (critics * 0.6) + (users * 0.4) + goty_bonus
+        for item_id, (critics, users, goty_bonus) in scores.items()
+    }
+    
+    # Partial sort - O(N log limit) instead of sorting every game
+    return heapq.nlargest(limit, games_response.data, key=lambda game: composite.get(game['id'], 0))
 
-async def create_games_predefined_list(games: List[Dict]) -> bool:
+async def create_games_predefined_list(size: int) -> bool:
     """Create predefined list for games"""
     
     try:
@@ -130,7 +466,7 @@ async def create_games_predefined_list(games: List[Dict]) -> bool:
             "category": "games",
             "subcategory": "video_games",
             "predefined": True,
-            "size": len(games)
+            "size": size
         }).execute()
         
         if not list_response.data:
@@ -140,58 +476,20 @@ async def create_games_predefined_list(games: List[Dict]) -> bool:
         list_obj = list_response.data[0]
         list_id = list_obj['id']
         
-        # Get created game items
-        games_response = supabase.table("items").select("*").eq("category", "games").execute()
+        # Ranked server-side in one round trip (falls back to Python scoring)
+        top_games = _fetch_top_games(50)
         
-        if not games_response.data:
+        if not top_games:
             print("✗ No games found to add to list")
             return False
         
-        # Sort games by a combination of critic score and user score for ranking
-        def get_game_score(game_data):
-            """Calculate composite score for ranking"""
-            try:
-                # Get accolades for this game
-                accolades_response = supabase.table("accolades").select("*").eq("item_id", game_data['id']).execute()
-                
-                critics_score = 0
-                users_score = 0
-                goty_bonus = 0
-                
-                for accolade in accolades_response.data:
-                    if accolade['type'] == 'metacritic_critics':
-                        critics_score = int(accolade['value'])
-                    elif accolade['type'] == 'metacritic_users':
-                        users_score = int(accolade['value'])
-                    elif accolade['type'] == 'goty':
-                        goty_bonus = 10  # GOTY bonus
-                
-                # Weighted score: 60% critics, 40% users, plus GOTY bonus
-                composite_score = (critics_score * 0.6) + (users_score * 0.4) + goty_bonus
-                return composite_score
-                
-            except:
-                return 0
-        
-        # Sort games by composite score
-        sorted_games = sorted(games_response.data, key=get_game_score, reverse=True)
-        
-        # Add games to list
-        items_added = 0
-        for i, game in enumerate(sorted_games[:50]):  # Top 50 games
-            try:
-                list_item_response = supabase.table("list_items").insert({
-                    "list_id": list_id,
-                    "item_id": game['id'],
-                    "ranking": i + 1
-                }).execute()
-                
-                if list_item_response.data:
-                    items_added += 1
-                    print(f"  → Added {game['name']} at ranking {i + 1}")
-                    
-            except Exception as e:
-                print(f"  ✗ Failed to add {game['name']} to list: {e}")
+        # Add top 50 games to list in one insert
+        list_items_payload = [
+            {"list_id": list_id, "item_id": game['id'], "ranking": i + 1}
+            for i, game in enumerate(top_games)
+        ]
+        list_items_response = supabase.table("list_items").insert(list_items_payload).execute()
+        items_added = len(list_items_response.data or [])
         
         print(f"✓ Created games list with {items_added} items")
         return True
@@ -208,53 +506,24 @@ async def import_games_data():
     csv_path = os.path.join(os.path.dirname(__file__), "games.csv")
     
     try:
-        games_data = []
-        games_created = 0
+        games = read_games_csv(csv_path)
         
-        with open(csv_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            
-            for row in reader:
-                # Skip rows with missing essential data
-                if not row.get('Name') or not row.get('item_year'):
-                    print(f"⚠ Skipping row with missing data: {row}")
-                    continue
-                
-                try:
-                    item_year = int(row['item_year'])
-                except (ValueError, TypeError):
-                    print(f"⚠ Invalid year for {row.get('Name', 'Unknown')}: {row.get('item_year')}")
-                    continue
-                
-                # Prepare description
-                description = f"Video game developed by {row.get('Group', 'Unknown')} in {item_year}"
-                if row.get('Description'):
-                    description += f". Genre: {row['Description']}"
-                
-                # Create game with accolades
-                success = await create_game_with_accolades(
-                    name=row['Name'],
-                    item_year=item_year,
-                    group=row.get('Group', 'Unknown Developer'),
-                    description=description,
-                    meta_users=row.get('Meta - Users', ''),
-                    meta_critics=row.get('Meta - Critics', ''),
-                    goty=row.get('Game of the year', '')
-                )
-                
-                if success:
-                    games_created += 1
-                    games_data.append(row)
-                
-                # Add small delay to avoid overwhelming the database
-                await asyncio.sleep(0.1)
+        # Create all games and accolades in bulk - direct Postgres when configured
+        pool = await get_pg_pool()
+        if pool is not None:
+            try:
+                games_created = await create_games_with_accolades_pg(pool, games)
+            finally:
+                await pool.close()
+        else:
+            games_created = await create_games_with_accolades(games)
         
         print(f"\n✅ Games import completed: {games_created} games created")
         
         # Create predefined list
-        if games_data:
+        if games_created:
             print("\n📋 Creating predefined games list...")
-            await create_games_predefined_list(games_data)
+            await create_games_predefined_list(games_created)
         
         return games_created
         
@@ -272,35 +541,45 @@ async def verify_games_import():
     
     try:
         # Check games count
-        games_response = supabase.table("items").select("*").eq("category", "games").execute()
-        print(f"Total games imported: {len(games_response.data)}")
+        # Count-only HEAD request - no rows cross the wire
+        games_count = supabase.table("items").select("id", count="exact", head=True).eq("category", "games").execute()
+        print(f"Total games imported: {games_count.count}")
         
         # Check accolades distribution
-        accolades_response = supabase.table("accolades").select("*").execute()
+        accolades_response = supabase.table("accolades").select("type").execute()
         
-        accolade_types = {}
-        for accolade in accolades_response.data:
-            acc_type = accolade.get('type', 'unknown')
-            accolade_types[acc_type] = accolade_types.get(acc_type, 0) + 1
+        accolade_types = Counter(accolade.get('type', 'unknown') for accolade in accolades_response.data)
         
-        print("\nAccolades by type:")
+        lines = ["\nAccolades by type:"]
         for acc_type, count in accolade_types.items():
             if 'metacritic' in acc_type or 'goty' in acc_type:
-                print(f"  - {acc_type}: {count}")
+                lines.append(f"  - {acc_type}: {count}")
+        print("\n".join(lines))
         
         # Show sample games with accolades
         print("\n📋 Sample Games:")
-        for game in games_response.data[:5]:
-            print(f"\n{game['name']} ({game['item_year']}) - {game['group']}")
-            
-            # Get accolades for this game
-            game_accolades = supabase.table("accolades").select("*").eq("item_id", game['id']).execute()
-            for accolade in game_accolades.data:
-                print(f"  • {accolade['name']}: {accolade['value']} ({accolade['type']})")
+        sample_response = supabase.table("items").select("id,name,item_year,group").eq("category", "games").limit(5).execute()
+        sample_games = sample_response.data or []
+        
+        # Get accolades for all sample games in one query
+        sample_ids = [game['id'] for game in sample_games]
+        accolades_by_item = {}
+        if sample_ids:
+            sample_accolades = supabase.table("accolades").select("item_id,name,value,type").in_("item_id", sample_ids).execute()
+            for accolade in sample_accolades.data or []:
+                accolades_by_item.setdefault(accolade['item_id'], []).append(accolade)
+        
+        lines = []
+        for game in sample_games:
+            lines.append(f"\n{game['name']} ({game['item_year']}) - {game['group']}")
+            for accolade in accolades_by_item.get(game['id'], []):
+                lines.append(f"  • {accolade['name']}: {accolade['value']} ({accolade['type']})")
+        if lines:
+            print("\n".join(lines))
         
         # Check predefined list
-        games_lists = supabase.table("lists").select("*").eq("category", "games").execute()
-        print(f"\nGames lists created: {len(games_lists.data)}")
+        games_lists = supabase.table("lists").select("id", count="exact", head=True).eq("category", "games").execute()
+        print(f"\nGames lists created: {games_lists.count}")
         
         print("\n✅ Verification completed!")
         
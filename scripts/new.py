@@ -1,18 +1,42 @@
-import google.generativeai as genai
+import asyncio
+import importlib.util
+import math
 import os
 import json
 import argparse
+import logging
 import re
-from typing import Dict, Any, Optional, List
+import sqlite3
+import tempfile
+import time
+from collections import deque
+from itertools import islice
+from typing import Dict, Any, Iterable, Literal, Optional, List
+import httpx
 from dotenv import load_dotenv
+from google import genai
+from google.genai import errors as genai_errors, types as genai_types
+import orjson
+from pydantic import BaseModel, ValidationError
 from supabase import create_client, Client
+from tenacity import retry, retry_if_exception, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+from tqdm import tqdm
+from tqdm.contrib.logging import logging_redirect_tqdm
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 ## python scripts/new.py --name "Lionel Messi" --category "sports"  --subcategory "football"
+## python scripts/new.py --batch-file scripts/batch.json --batch-mode  (Gemini Batch Mode, ~50% cheaper)
 ## opravit subkategorii u fotbalu
 ## vytvořit si batch soubor
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Supabase configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
@@ -23,150 +47,126 @@ if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
 # Initialize Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
 
-class WikiDBUpdater:
-    """Enhanced wiki script that updates/creates items in Supabase database"""
-    
-    def __init__(self):
-        self.setup_gemini()
-        self.supabase = supabase
-        
-    def setup_gemini(self):
-        """Initialize Gemini API"""
-        try:
-            api_key = os.environ['GOOGLE_API_KEY']
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash-latest')
-            print("✅ Gemini API configured successfully")
-        except KeyError:
-            print("🔴 ERROR: GOOGLE_API_KEY environment variable not set.")
-            exit()
-        except Exception as e:
-            print(f"🔴 ERROR: Could not configure Gemini API: {e}")
-            exit()
-    
-    def clean_json_response(self, text: str) -> str:
-        """Clean JSON response by removing comments and markdown formatting"""
-        # Remove markdown code block markers
-        text = re.sub(r'```json\s*', '', text)
-        text = re.sub(r'```\s*$', '', text)
-        text = text.strip()
-        
-        # Remove // comments from JSON
-        # This regex matches // comments but not URLs (which have //)
-        lines = text.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            # Find // that are not part of URLs
-            # Look for // that are not preceded by http: or https:
-            comment_match = re.search(r'(?<!:)//.*$', line)
-            if comment_match:
-                # Remove the comment part
-                line = line[:comment_match.start()].rstrip()
-                # Remove trailing comma if it exists after removing comment
-                line = re.sub(r',\s*$', '', line)
-            cleaned_lines.append(line)
-        
-        # Join lines back
-        cleaned_text = '\n'.join(cleaned_lines)
-        
-        # Remove any trailing commas before closing braces/brackets
-        cleaned_text = re.sub(r',(\s*[}\]])', r'\1', cleaned_text)
-        
-        return cleaned_text.strip()
-    
-    def extract_json_from_response(self, response_text: str) -> Optional[Dict[str, Any]]:
-        """Extract and parse JSON from Gemini response with improved error handling"""
-        try:
-            print(f"📄 Raw response preview: {response_text[:200]}...")
-            
-            # Clean the response
-            cleaned_text = self.clean_json_response(response_text)
-            print(f"🧹 Cleaned text preview: {cleaned_text[:200]}...")
-            
-            # Method 1: Try to parse the cleaned text directly
-            try:
-                data = json.loads(cleaned_text)
-                print(f"✅ Successfully parsed JSON (direct method): {data}")
-                return data
-            except json.JSONDecodeError as e:
-                print(f"⚠️ Direct parsing failed: {e}")
-            
-            # Method 2: Extract JSON blocks with better logic
-            json_blocks = []
-            brace_count = 0
-            start_pos = -1
-            
-            for i, char in enumerate(cleaned_text):
-                if char == '{':
-                    if brace_count == 0:
-                        start_pos = i
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0 and start_pos != -1:
-                        json_block = cleaned_text[start_pos:i+1]
-                        json_blocks.append(json_block)
-                        start_pos = -1
-            
-            # Try to parse each JSON block
-            for json_block in json_blocks:
-                try:
-                    # Additional cleaning for the specific block
-                    json_block = re.sub(r',(\s*[}\]])', r'\1', json_block)  # Remove trailing commas
-                    data = json.loads(json_block)
-                    print(f"✅ Successfully parsed JSON (block method): {data}")
-                    return data
-                except json.JSONDecodeError as e:
-                    print(f"⚠️ Block parsing failed: {e}")
-                    print(f"Failed block: {json_block}")
-                    continue
-            
-            # Method 3: Try to manually extract key-value pairs if JSON parsing fails
-            print("⚠️ Attempting manual extraction...")
-            return self.manual_json_extraction(cleaned_text)
-            
-        except Exception as e:
-            print(f"🔴 Error in JSON extraction: {e}")
-            return None
-    
-    def manual_json_extraction(self, text: str) -> Optional[Dict[str, Any]]:
-        """Manually extract data from JSON-like text when parsing fails"""
-        try:
-            data = {}
-            
-            # Extract key patterns
-            patterns = {
-                'status': r'"status":\s*"([^"]*)"',
-                'item_year': r'"item_year":\s*"([^"]*)"',
-                'item_year_to': r'"item_year_to":\s*"([^"]*)"',
-                'reference_url': r'"reference_url":\s*"([^"]*)"',
-                'image_url': r'"image_url":\s*"([^"]*)"',
-                'group': r'"group":\s*"([^"]*)"',
-                'description': r'"description":\s*"([^"]*)"'
-            }
-            
-            for key, pattern in patterns.items():
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    data[key] = match.group(1)
-            
-            if data and 'status' in data:
-                print(f"✅ Manual extraction successful: {data}")
-                return data
-            else:
-                print("⚠️ Manual extraction failed - no status found")
-                return None
-                
-        except Exception as e:
-            print(f"🔴 Manual extraction error: {e}")
-            return None
-    
-    def get_research_prompt(self, name: str, category: str, subcategory: str) -> str:
-        """Get research prompt - UPDATED to discourage comments"""
-        
-        if category == 'sports':
-            return f"""
+# Direct Postgres connection (optional) - batch writes bypass PostgREST when set
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Swap PostgREST's session for a pooled keep-alive client so batch bursts reuse
+# connections instead of paying TCP/TLS setup per request (HTTP/2 when h2 is installed)
+_default_session = supabase.postgrest.session
+supabase.postgrest.session = httpx.Client(
+    base_url=_default_session.base_url,
+    headers=_default_session.headers,
+    http2=importlib.util.find_spec("h2") is not None,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+    timeout=10.0
+)
+_default_session.close()
+
+GEMINI_MODEL = 'gemini-1.5-flash-latest'
+# Concurrent Gemini calls, sized to stay under the per-key RPM limit across all keys:
+# ceil(RPM * keys / 60 * avg latency) * 0.7 unless GEMINI_CONCURRENCY is set
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "15"))
+GEMINI_AVG_SECONDS = 3
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "0"))
+GEMINI_MAX_RETRIES = 5
+# A key that hit a 429 is skipped by the rotation for this long
+GEMINI_KEY_COOLDOWN_SECONDS = 60
+# Longest Retry-After we're willing to sleep for before the next attempt
+RETRY_AFTER_MAX_SECONDS = 60
+
+_backoff = wait_exponential_jitter(initial=1, max=30)
+
+def _is_transient_gemini_error(exc: BaseException) -> bool:
+    """429 rate limits and dropped connections are worth another attempt, bad requests aren't"""
+    if isinstance(exc, genai_errors.APIError):
+        return exc.code == 429
+    return isinstance(exc, httpx.TransportError)
+
+def _retry_wait(retry_state) -> float:
+    """Honor the server's Retry-After header when present, else exponential backoff with jitter"""
+    exc = retry_state.outcome.exception()
+    headers = getattr(getattr(exc, 'response', None), 'headers', None) or {}
+    try:
+        return min(float(headers.get('retry-after')), RETRY_AFTER_MAX_SECONDS)
+    except (TypeError, ValueError):
+        return _backoff(retry_state)
+
+def _log_retry(retry_state) -> None:
+    logger.warning(
+        f"⏳ {retry_state.fn.__name__} failed ({retry_state.outcome.exception()}), "
+        f"retrying in {retry_state.next_action.sleep:.1f}s..."
+    )
+
+class ResearchResult(BaseModel):
+    """Research response schema - Gemini decodes straight into this shape"""
+    status: Literal['success', 'failed']
+    item_year: Optional[str] = None
+    item_year_to: Optional[str] = None
+    reference_url: Optional[str] = None
+    image_url: Optional[str] = None
+    group: Optional[str] = None
+    description: Optional[str] = None
+
+# Schema-constrained JSON output, built once and shared by every realtime call
+RESEARCH_CONFIG = genai_types.GenerateContentConfig(
+    response_mime_type='application/json',
+    response_schema=ResearchResult
+)
+
+# Gemini Batch Mode - async, non-latency-critical research at reduced cost
+BATCH_MODEL = 'gemini-2.5-flash'
+BATCH_POLL_SECONDS = 30
+BATCH_DONE_STATES = {'JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED', 'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED'}
+
+# JSON cleanup patterns, compiled once instead of on every Gemini response
+_RE_JSON_FENCE = re.compile(r'```json\s*')
+_RE_FENCE_END = re.compile(r'```\s*$')
+# // comments to end of line (but not the // in URLs), in one pass over the whole text
+_RE_LINE_COMMENT = re.compile(r'[ \t]*(?<!:)//[^\n]*$', re.MULTILINE)
+_RE_TRAIL_COMMA = re.compile(r',(\s*[}\]])')
+# All manual-extraction keys in one named-group alternation - a single pass over the text
+_MANUAL_FIELDS = ('status', 'item_year', 'item_year_to', 'reference_url', 'image_url', 'group', 'description')
+_RE_MANUAL_FIELDS = re.compile(
+    '|'.join(rf'"{key}":\s*"(?P<{key}>[^"]*)"' for key in _MANUAL_FIELDS),
+    re.IGNORECASE
+)
+
+# Disk-backed research cache so reruns skip Gemini for items already researched
+RESEARCH_CACHE_PATH = os.getenv("RESEARCH_CACHE_PATH", "research_cache.db")
+
+# Batch writes: rows per upsert request, conflict target is the unique_item constraint
+UPSERT_CHUNK_SIZE = 200
+# Attempts per upsert request when the connection to PostgREST drops
+DB_MAX_RETRIES = 5
+ITEM_CONFLICT_COLUMNS = 'name,category,subcategory'
+# Existing-row prefetch: only the columns the update diff reads, names per in_() request (URL length)
+ITEM_PREFETCH_COLUMNS = 'id,name,category,subcategory,item_year,item_year_to,reference_url,image_url,group,description'
+PREFETCH_CHUNK_SIZE = 100
+# Research fields copied onto an existing row when its column is empty (same names in the table)
+_UPDATABLE_FIELDS = frozenset({'item_year', 'item_year_to', 'reference_url', 'image_url', 'group', 'description'})
+# Items researched and written per round in batch runs - bounds memory for streamed batch files
+BATCH_CHUNK_SIZE = 500
+# Integer columns - PostgREST casts research strings server-side, asyncpg needs real ints
+PG_INT_COLUMNS = {'item_year', 'item_year_to', 'view_count', 'selection_count'}
+
+def _pg_value(column: str, value: Any) -> Any:
+    """Coerce a research value to its items column type for asyncpg"""
+    if column in PG_INT_COLUMNS and not isinstance(value, int):
+        value = str(value).strip()
+        return int(value) if value.lstrip('-').isdecimal() else None
+    return value
+
+def _pg_upsert_sql(columns: tuple) -> str:
+    """INSERT ... ON CONFLICT statement updating every non-key column in `columns`"""
+    conflict_columns = ITEM_CONFLICT_COLUMNS.split(',')
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    placeholders = ', '.join(f'${i}' for i in range(1, len(columns) + 1))
+    updates = ', '.join(f'"{column}" = EXCLUDED."{column}"' for column in columns if column not in conflict_columns)
+    action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+    return f"INSERT INTO items ({column_list}) VALUES ({placeholders}) ON CONFLICT ({', '.join(conflict_columns)}) {action}"
+
+# Research prompt templates, filled with str.format (literal braces are doubled)
+_SPORTS_PROMPT = """
 Please research the following item metadata for a sports player:
 Name: "{name}"
 Category: {category} - {subcategory}
@@ -190,9 +190,8 @@ If no information can be found, return:
     "status": "failed"
 }}
 """
-        
-        elif category == 'games':
-            return f"""
+
+_GAMES_PROMPT = """
 Please research the following item metadata for a video game:
 Name: "{name}"
 Category: {category} - {subcategory}
@@ -217,9 +216,8 @@ If no information can be found, return:
     "status": "failed"
 }}
 """
-        
-        elif category == 'music':
-            return f"""
+
+_MUSIC_PROMPT = """
 Please research the following item metadata for a music artist/band:
 Name: "{name}"
 Category: {category} - {subcategory}
@@ -245,9 +243,8 @@ If no information can be found, return:
     "status": "failed"
 }}
 """
-        
-        else:
-            return f"""
+
+_DEFAULT_PROMPT = """
 Please research the following item metadata:
 Name: "{name}"
 Category: {category} - {subcategory}
@@ -258,7 +255,7 @@ Please provide ONLY a clean JSON object with no comments or additional text:
     "status": "success",
     "item_year": "2000",
     "item_year_to": "2023",
-    "reference_url": "https://en.wikipedia.org/wiki/{name.replace(' ', '_')}",
+    "reference_url": "https://en.wikipedia.org/wiki/{name_url}",
     "image_url": "https://upload.wikimedia.org/wikipedia/commons/example.jpg",
     "group": "General",
     "description": "Description of the item"
@@ -271,6 +268,195 @@ If no information can be found, return:
     "status": "failed"
 }}
 """
+
+_RESEARCH_PROMPTS = {
+    'sports': _SPORTS_PROMPT,
+    'games': _GAMES_PROMPT,
+    'music': _MUSIC_PROMPT,
+}
+
+class WikiDBUpdater:
+    """Enhanced wiki script that updates/creates items in Supabase database"""
+    
+    def __init__(self, force_refresh: bool = False):
+        self.setup_gemini()
+        self.supabase = supabase
+        # force_refresh skips cache reads - fresh results still overwrite the cache
+        self.force_refresh = force_refresh
+        self.setup_cache()
+        
+    def setup_cache(self):
+        """Open the research cache database"""
+        self.cache = sqlite3.connect(RESEARCH_CACHE_PATH)
+        self.cache.execute("CREATE TABLE IF NOT EXISTS cache(key TEXT PRIMARY KEY, data TEXT, ts INTEGER)")
+        self.cache.commit()
+    
+    @staticmethod
+    def research_cache_key(name: str, category: str, subcategory: str) -> str:
+        """Cache key for an item's research data"""
+        return f"{name}|{category}|{subcategory}"
+    
+    def get_cached_research(self, name: str, category: str, subcategory: str) -> Optional[Dict[str, Any]]:
+        """Cached research data for an item, None on miss or when refreshing"""
+        if self.force_refresh:
+            return None
+        row = self.cache.execute(
+            "SELECT data FROM cache WHERE key = ?",
+            (self.research_cache_key(name, category, subcategory),)
+        ).fetchone()
+        return orjson.loads(row[0]) if row else None
+    
+    def set_cached_research(self, name: str, category: str, subcategory: str, data: Dict[str, Any]) -> None:
+        """Store research data - failed lookups aren't cached so they get retried"""
+        if data.get('status') == 'failed':
+            return
+        self.cache.execute(
+            "INSERT OR REPLACE INTO cache(key, data, ts) VALUES (?, ?, ?)",
+            (self.research_cache_key(name, category, subcategory), orjson.dumps(data).decode(), int(time.time()))
+        )
+        self.cache.commit()
+        
+    def setup_gemini(self):
+        """Initialize Gemini API"""
+        try:
+            # GOOGLE_API_KEYS=key1,key2,... spreads realtime calls over several keys
+            api_keys = [key.strip() for key in os.getenv('GOOGLE_API_KEYS', '').split(',') if key.strip()]
+            if not api_keys:
+                api_keys = [os.environ['GOOGLE_API_KEY']]
+            
+            self.clients = deque(genai.Client(api_key=api_key) for api_key in api_keys)
+            self.client_cooldowns = {}
+            # Batch Mode (files/batches) jobs stay on the first key
+            self.client = self.clients[0]
+            self.concurrency = GEMINI_CONCURRENCY or max(
+                1, int(math.ceil(GEMINI_RPM * len(api_keys) / 60 * GEMINI_AVG_SECONDS) * 0.7)
+            )
+            print(f"✅ Gemini API configured successfully ({len(api_keys)} key(s))")
+        except KeyError:
+            print("🔴 ERROR: GOOGLE_API_KEY (or GOOGLE_API_KEYS) environment variable not set.")
+            exit()
+        except Exception as e:
+            print(f"🔴 ERROR: Could not configure Gemini API: {e}")
+            exit()
+    
+    def clean_json_response(self, text: str) -> str:
+        """Clean JSON response by removing comments and markdown formatting"""
+        # Remove markdown code block markers
+        text = _RE_JSON_FENCE.sub('', text)
+        text = _RE_FENCE_END.sub('', text)
+        text = text.strip()
+        
+        # Remove // comments from JSON
+        # Commas before a comment are kept - the pass below drops the ones left dangling
+        cleaned_text = _RE_LINE_COMMENT.sub('', text)
+        
+        # Remove any trailing commas before closing braces/brackets
+        cleaned_text = _RE_TRAIL_COMMA.sub(r'\1', cleaned_text)
+        
+        return cleaned_text.strip()
+    
+    def parse_research_response(self, response_text: str) -> Optional[Dict[str, Any]]:
+        """Validate a structured JSON response, falling back to the cleanup pipeline"""
+        try:
+            return ResearchResult.model_validate_json(response_text).model_dump(exclude_none=True)
+        except ValidationError as e:
+            logger.debug("⚠️ Response didn't match the research schema (%s errors), cleaning it up...", e.error_count())
+            return self.extract_json_from_response(response_text)
+    
+    def extract_json_from_response(self, response_text: str) -> Optional[Dict[str, Any]]:
+        """Extract and parse JSON from Gemini response with improved error handling"""
+        try:
+            logger.debug("📄 Raw response preview: %s...", response_text[:200])
+            
+            # Clean the response
+            cleaned_text = self.clean_json_response(response_text)
+            logger.debug("🧹 Cleaned text preview: %s...", cleaned_text[:200])
+            
+            # Method 1: Try to parse the cleaned text directly (orjson is several times faster)
+            try:
+                data = orjson.loads(cleaned_text)
+                logger.debug("✅ Successfully parsed JSON (direct method): %s", data)
+                return data
+            except orjson.JSONDecodeError as e:
+                logger.debug("⚠️ Direct parsing failed: %s", e)
+            
+            # Method 1b: Parse the outermost {...} span - covers prose around a single object
+            start = cleaned_text.find('{')
+            end = cleaned_text.rfind('}')
+            if start != -1 and end > start and (start, end) != (0, len(cleaned_text) - 1):
+                try:
+                    data = orjson.loads(cleaned_text[start:end + 1])
+                    logger.debug("✅ Successfully parsed JSON (span method): %s", data)
+                    return data
+                except orjson.JSONDecodeError as e:
+                    logger.debug("⚠️ Span parsing failed: %s", e)
+            
+            # Method 2: Extract JSON blocks with better logic (multi-object payloads)
+            json_blocks = []
+            brace_count = 0
+            start_pos = -1
+            
+            for i, char in enumerate(cleaned_text):
+                if char == '{':
+                    if brace_count == 0:
+                        start_pos = i
+                    brace_count += 1
+                elif char == '}':
+                    brace_count -= 1
+                    if brace_count == 0 and start_pos != -1:
+                        json_block = cleaned_text[start_pos:i+1]
+                        json_blocks.append(json_block)
+                        start_pos = -1
+            
+            # Try to parse each JSON block
+            for json_block in json_blocks:
+                try:
+                    # Additional cleaning for the specific block
+                    json_block = _RE_TRAIL_COMMA.sub(r'\1', json_block)  # Remove trailing commas
+                    data = orjson.loads(json_block)
+                    logger.debug("✅ Successfully parsed JSON (block method): %s", data)
+                    return data
+                except orjson.JSONDecodeError as e:
+                    logger.debug("⚠️ Block parsing failed: %s", e)
+                    logger.debug("Failed block: %s", json_block)
+                    continue
+            
+            # Method 3: Try to manually extract key-value pairs if JSON parsing fails
+            logger.debug("⚠️ Attempting manual extraction...")
+            return self.manual_json_extraction(cleaned_text)
+            
+        except Exception as e:
+            logger.warning(f"🔴 Error in JSON extraction: {e}")
+            return None
+    
+    def manual_json_extraction(self, text: str) -> Optional[Dict[str, Any]]:
+        """Manually extract data from JSON-like text when parsing fails"""
+        try:
+            data = {}
+            
+            # Extract key patterns - first occurrence of each key wins
+            for match in _RE_MANUAL_FIELDS.finditer(text):
+                data.setdefault(match.lastgroup, match.group(match.lastgroup))
+            
+            if data and 'status' in data:
+                logger.debug("✅ Manual extraction successful: %s", data)
+                return data
+            else:
+                logger.debug("⚠️ Manual extraction failed - no status found")
+                return None
+                
+        except Exception as e:
+            logger.warning(f"🔴 Manual extraction error: {e}")
+            return None
+    
+    def get_research_prompt(self, name: str, category: str, subcategory: str) -> str:
+        """Get research prompt - UPDATED to discourage comments"""
+        return _RESEARCH_PROMPTS.get(category, _DEFAULT_PROMPT).format(
+            name=name,
+            category=category,
+            subcategory=subcategory,
+            name_url=name.replace(' ', '_')
+        )
     
     def check_item_exists(self, name: str, category: str, subcategory: str) -> Optional[Dict[str, Any]]:
         """Check if item already exists in database"""
@@ -288,64 +474,115 @@ If no information can be found, return:
             print(f"🔴 Error checking item existence: {e}")
             return None
     
-    def get_research_data(self, name: str, category: str, subcategory: str) -> Optional[Dict[str, Any]]:
+    def prefetch_existing_items(self, items: List[Dict[str, str]]) -> Dict[tuple, Dict[str, Any]]:
+        """Fetch existing rows for a batch in one query per (category, subcategory) group"""
+        names_by_group = {}
+        for item in items:
+            names_by_group.setdefault((item['category'], item.get('subcategory', '')), set()).add(item['name'])
+        
+        existing = {}
+        for (category, subcategory), names in names_by_group.items():
+            names = list(names)
+            for i in range(0, len(names), PREFETCH_CHUNK_SIZE):
+                try:
+                    response = (
+                        self.supabase.table('items')
+                        .select(ITEM_PREFETCH_COLUMNS)
+                        .eq('category', category)
+                        .eq('subcategory', subcategory)
+                        .in_('name', names[i:i + PREFETCH_CHUNK_SIZE])
+                        .execute()
+                    )
+                except Exception as e:
+                    print(f"🔴 Error prefetching existing items for {category}/{subcategory}: {e}")
+                    continue
+                for row in response.data or []:
+                    existing[(row['name'], row['category'], row['subcategory'])] = row
+        
+        logger.debug("✅ Found %s existing items in database", len(existing))
+        return existing
+    
+    def next_client(self):
+        """Round-robin pick of the next Gemini client, skipping keys cooling off after a 429"""
+        # No awaits in here, so concurrent tasks on the event loop can't interleave
+        now = time.monotonic()
+        for _ in range(len(self.clients)):
+            client = self.clients[0]
+            self.clients.rotate(-1)
+            if self.client_cooldowns.get(client, 0) <= now:
+                return client
+        # Every key is cooling off - use the one that frees up first
+        return min(self.clients, key=lambda client: self.client_cooldowns.get(client, 0))
+    
+    @retry(
+        wait=_retry_wait,
+        stop=stop_after_attempt(GEMINI_MAX_RETRIES),
+        retry=retry_if_exception(_is_transient_gemini_error),
+        before_sleep=_log_retry,
+        reraise=True
+    )
+    async def _call_gemini(self, prompt: str):
+        """Call Gemini on the next key - tenacity retries rate limits and network errors"""
+        client = self.next_client()
+        try:
+            return await client.aio.models.generate_content(model=GEMINI_MODEL, contents=prompt, config=RESEARCH_CONFIG)
+        except genai_errors.APIError as e:
+            if e.code == 429:
+                # Rest this key so the retry goes out on another one
+                self.client_cooldowns[client] = time.monotonic() + GEMINI_KEY_COOLDOWN_SECONDS
+            raise
+    
+    async def get_research_data(self, name: str, category: str, subcategory: str) -> Optional[Dict[str, Any]]:
         """Get research data from Gemini API with improved JSON handling"""
         try:
+            cached = self.get_cached_research(name, category, subcategory)
+            if cached is not None:
+                logger.debug("💾 Using cached research for %s", name)
+                return cached
+            
             # Get the complete prompt
             prompt = self.get_research_prompt(name, category, subcategory)
             
-            print(f"🔍 Researching {name} ({category}/{subcategory})...")
+            logger.debug("🔍 Researching %s (%s/%s)...", name, category, subcategory)
             
             # Generate content
-            response = self.model.generate_content(prompt)
+            response = await self._call_gemini(prompt)
             
             if response and response.text:
-                print(f"✅ Received response from Gemini")
+                logger.debug("✅ Received response from Gemini")
                 
-                # Use improved JSON extraction
-                data = self.extract_json_from_response(response.text)
+                # Structured output - the JSON cleanup only runs if it doesn't validate
+                data = self.parse_research_response(response.text)
                 
                 if data:
+                    self.set_cached_research(name, category, subcategory, data)
                     return data
                 else:
-                    print(f"⚠️ Could not extract valid JSON from response")
-                    print(f"Full response: {response.text}")
+                    logger.warning(f"⚠️ Could not extract valid JSON from response for {name}")
+                    logger.debug("Full response: %s", response.text)
                     return None
             else:
-                print("⚠️ Empty response from Gemini")
+                logger.warning(f"⚠️ Empty response from Gemini for {name}")
                 return None
                 
         except Exception as e:
-            print(f"🔴 Error getting research data: {e}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.warning(f"🔴 Error getting research data for {name}: {e}")
+            # Traceback only formatted when --verbose enables DEBUG
+            logger.debug("Error getting research data", exc_info=True)
             return None
     
     # ... (keep all other methods the same - get_columns_to_update, update_existing_item, create_new_item, process_item, process_batch, main)
     
     def get_columns_to_update(self, existing_item: Dict[str, Any], research_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Determine which columns need to be updated"""
-        updates = {}
-        
-        # Define mappings between research data and database columns
-        field_mappings = {
-            'item_year': 'item_year',
-            'item_year_to': 'item_year_to',
-            'reference_url': 'reference_url',
-            'image_url': 'image_url',
-            'group': 'group',
-            'description': 'description'
+        """Determine which columns need to be updated - only fill fields the database row lacks"""
+        updates = {
+            field: value for field, value in research_data.items()
+            if field in _UPDATABLE_FIELDS and value and not existing_item.get(field)
         }
         
-        for research_field, db_field in field_mappings.items():
-            if research_field in research_data and research_data[research_field]:
-                # Update if database field is null or empty
-                existing_value = existing_item.get(db_field)
-                if not existing_value or existing_value == '' or existing_value is None:
-                    updates[db_field] = research_data[research_field]
-                    print(f"📝 Will update {db_field}: {research_data[research_field]}")
-                else:
-                    print(f"ℹ️ Skipping {db_field} - already has value: {existing_value}")
+        if logger.isEnabledFor(logging.DEBUG):
+            skipped = [field for field in _UPDATABLE_FIELDS if research_data.get(field) and field not in updates]
+            logger.debug("📝 %s: updates=%s skipped=%s", existing_item.get('name'), updates, skipped)
         
         return updates
     
@@ -369,30 +606,33 @@ If no information can be found, return:
                 
         except Exception as e:
             print(f"🔴 Error updating item: {e}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.debug("Error updating item", exc_info=True)
             return False
     
+    def build_new_item(self, name: str, category: str, subcategory: str, research_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the items row for a new item from research data"""
+        item_data = {
+            'name': name,
+            'category': category,
+            'subcategory': subcategory,
+            'description': research_data.get('description', ''),
+            'item_year': research_data.get('item_year'),
+            'item_year_to': research_data.get('item_year_to'),
+            'reference_url': research_data.get('reference_url'),
+            'image_url': research_data.get('image_url'),
+            'group': research_data.get('group'),
+            'view_count': 0,
+            'selection_count': 0
+        }
+        
+        # Remove None values
+        return {k: v for k, v in item_data.items() if v is not None and v != ''}
+    
     def create_new_item(self, name: str, category: str, subcategory: str, research_data: Dict[str, Any]) -> bool:
         """Create new item in database"""
         try:
             # Prepare item data
-            item_data = {
-                'name': name,
-                'category': category,
-                'subcategory': subcategory,
-                'description': research_data.get('description', ''),
-                'item_year': research_data.get('item_year'),
-                'item_year_to': research_data.get('item_year_to'),
-                'reference_url': research_data.get('reference_url'),
-                'image_url': research_data.get('image_url'),
-                'group': research_data.get('group'),
-                'view_count': 0,
-                'selection_count': 0
-            }
-            
-            # Remove None values
-            item_data = {k: v for k, v in item_data.items() if v is not None and v != ''}
+            item_data = self.build_new_item(name, category, subcategory, research_data)
             
             print(f"🆕 Creating new item: {item_data}")
             
@@ -407,29 +647,45 @@ If no information can be found, return:
                 
         except Exception as e:
             print(f"🔴 Error creating item: {e}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.debug("Error creating item", exc_info=True)
             return False
     
-    def process_item(self, name: str, category: str, subcategory: str = '') -> bool:
-        """Process a single item - update or create"""
-        print(f"\n{'='*60}")
-        print(f"Processing: {name} ({category}/{subcategory})")
-        print(f"{'='*60}")
+    async def research_item(self, name: str, category: str, subcategory: str = '') -> Optional[Dict[str, Any]]:
+        """Research a single item - returns research data, None on failure"""
+        logger.debug("Processing: %s (%s/%s)", name, category, subcategory)
         
-        # Step 1: Check if item exists
-        existing_item = self.check_item_exists(name, category, subcategory)
-        
-        # Step 2: Get research data
-        research_data = self.get_research_data(name, category, subcategory)
+        research_data = await self.get_research_data(name, category, subcategory)
         
         if not research_data or research_data.get('status') == 'failed':
-            print(f"⚠️ No research data found for {name}")
-            return False
+            logger.warning(f"⚠️ No research data found for {name}")
+            return None
         
+        logger.debug("📊 Research data for %s: %s", name, research_data)
+        return research_data
+    
+    async def process_item(self, name: str, category: str, subcategory: str = '') -> bool:
+        """Process a single item - update or create"""
+        # Step 1: Check if item exists (supabase client is sync - keep it off the event loop)
+        existing_item = await asyncio.to_thread(self.check_item_exists, name, category, subcategory)
+        
+        # Step 2: Get research data
+        research_data = await self.research_item(name, category, subcategory)
+        if research_data is None:
+            return False
         print(f"📊 Research data: {json.dumps(research_data, indent=2)}")
         
         # Step 3: Update or create
+        return await asyncio.to_thread(self.apply_research_data, name, category, subcategory, existing_item, research_data)
+    
+    def apply_research_data(
+        self,
+        name: str,
+        category: str,
+        subcategory: str,
+        existing_item: Optional[Dict[str, Any]],
+        research_data: Dict[str, Any]
+    ) -> bool:
+        """Update the existing item with research data, or create it"""
         if existing_item:
             # Update existing item
             updates = self.get_columns_to_update(existing_item, research_data)
@@ -438,39 +694,294 @@ If no information can be found, return:
             # Create new item
             return self.create_new_item(name, category, subcategory, research_data)
     
-    def process_batch(self, items: List[Dict[str, str]]) -> None:
-        """Process a batch of items"""
-        print(f"🚀 Starting batch processing of {len(items)} items...")
+    def submit_batch_mode(self, items: List[Dict[str, str]]) -> None:
+        """Research a batch through Gemini Batch Mode, then update/create the items"""
+        print(f"🚀 Submitting {len(items)} items to Gemini Batch Mode...")
+        
+        # One JSONL request per item, keyed by position so results map back
+        requests = [
+            {
+                "key": f"req_{i}",
+                "request": {
+                    "contents": [{"parts": [{"text": self.get_research_prompt(
+                        item['name'], item['category'], item.get('subcategory', '')
+                    )}]}],
+                    "generation_config": {"response_mime_type": "application/json"}
+                }
+            }
+            for i, item in enumerate(items)
+        ]
+        
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', encoding='utf-8', delete=False) as f:
+            f.write('\n'.join(json.dumps(request) for request in requests))
+            requests_path = f.name
+        
+        try:
+            uploaded = self.client.files.upload(
+                file=requests_path,
+                config=genai_types.UploadFileConfig(display_name='item-research', mime_type='jsonl')
+            )
+        finally:
+            os.remove(requests_path)
+        
+        batch_job = self.client.batches.create(
+            model=BATCH_MODEL,
+            src=uploaded.name,
+            config={'display_name': 'item-research'}
+        )
+        print(f"📤 Created batch job: {batch_job.name}")
+        
+        while batch_job.state.name not in BATCH_DONE_STATES:
+            print(f"⏳ Batch job state: {batch_job.state.name}, checking again in {BATCH_POLL_SECONDS}s...")
+            time.sleep(BATCH_POLL_SECONDS)
+            batch_job = self.client.batches.get(name=batch_job.name)
+        
+        if batch_job.state.name != 'JOB_STATE_SUCCEEDED':
+            print(f"🔴 Batch job finished with state {batch_job.state.name}: {batch_job.error}")
+            return
+        
+        results = self.client.files.download(file=batch_job.dest.file_name).decode('utf-8')
+        existing = self.prefetch_existing_items(items)
         
         success_count = 0
         fail_count = 0
         
-        for i, item in enumerate(items, 1):
+        for line in results.splitlines():
+            if not line.strip():
+                continue
+            
             try:
-                print(f"\n[{i}/{len(items)}] Processing next item...")
+                result = json.loads(line)
+                item = items[int(result['key'].split('_', 1)[1])]
+            except (ValueError, KeyError, IndexError) as e:
+                print(f"🔴 Unreadable batch result line: {e}")
+                fail_count += 1
+                continue
+            
+            name = item['name']
+            category = item['category']
+            subcategory = item.get('subcategory', '')
+            
+            try:
+                if 'error' in result:
+                    print(f"🔴 Batch request failed for {name}: {result['error']}")
+                    fail_count += 1
+                    continue
                 
-                name = item['name']
-                category = item['category']
-                subcategory = item.get('subcategory', '')
+                text = result['response']['candidates'][0]['content']['parts'][0]['text']
+                research_data = self.parse_research_response(text)
                 
-                success = self.process_item(name, category, subcategory)
+                if not research_data or research_data.get('status') == 'failed':
+                    print(f"⚠️ No research data found for {name}")
+                    fail_count += 1
+                    continue
                 
-                if success:
+                self.set_cached_research(name, category, subcategory, research_data)
+                existing_item = existing.get((name, category, subcategory))
+                if self.apply_research_data(name, category, subcategory, existing_item, research_data):
                     success_count += 1
                 else:
                     fail_count += 1
                     
             except Exception as e:
-                print(f"🔴 Error processing item {item}: {e}")
+                print(f"🔴 Error processing batch result for {name}: {e}")
                 fail_count += 1
         
         print(f"\n{'='*60}")
-        print(f"📊 Batch Processing Complete!")
+        print(f"📊 Batch Mode Processing Complete!")
         print(f"✅ Successful: {success_count}")
         print(f"🔴 Failed: {fail_count}")
-        if success_count + fail_count > 0:
-            print(f"📈 Success Rate: {success_count/(success_count + fail_count)*100:.1f}%")
         print(f"{'='*60}")
+    
+    @staticmethod
+    def group_item_rows(rows: List[Dict[str, Any]]) -> tuple:
+        """Drop in-batch duplicates and group rows by column set - returns (groups, duplicates)"""
+        # Same item twice in a batch can't be upserted in one statement, keep the first
+        unique_rows = {}
+        for row in rows:
+            unique_rows.setdefault((row['name'], row['category'], row.get('subcategory')), row)
+        
+        # Bulk writes take one column list per statement, so rows that set
+        # different columns go in separate requests (otherwise missing ones are nulled)
+        groups = {}
+        for row in unique_rows.values():
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        
+        return groups, len(rows) - len(unique_rows)
+    
+    @retry(
+        wait=_backoff,
+        stop=stop_after_attempt(DB_MAX_RETRIES),
+        retry=retry_if_exception_type(httpx.TransportError),
+        before_sleep=_log_retry,
+        reraise=True
+    )
+    def _db_upsert(self, rows) -> None:
+        """Upsert rows into items, retrying dropped connections to PostgREST"""
+        self.supabase.table('items').upsert(rows, on_conflict=ITEM_CONFLICT_COLUMNS).execute()
+    
+    def upsert_items(self, rows: List[Dict[str, Any]]) -> tuple:
+        """Bulk upsert item rows in chunks - returns (written, failed)"""
+        groups, duplicates = self.group_item_rows(rows)
+        
+        # Dropped duplicates are covered by the row kept for their key
+        written = duplicates
+        failed = 0
+        
+        for group_rows in groups.values():
+            for i in range(0, len(group_rows), UPSERT_CHUNK_SIZE):
+                chunk = group_rows[i:i + UPSERT_CHUNK_SIZE]
+                try:
+                    self._db_upsert(chunk)
+                    written += len(chunk)
+                except Exception as e:
+                    # One bad row fails the whole chunk - retry row by row to isolate it
+                    print(f"⚠️ Bulk upsert of {len(chunk)} items failed ({e}), retrying one by one...")
+                    for row in chunk:
+                        try:
+                            self._db_upsert(row)
+                            written += 1
+                        except Exception as row_error:
+                            print(f"🔴 Error upserting item {row['name']}: {row_error}")
+                            failed += 1
+        
+        logger.info(f"💾 Upserted {written} items ({failed} failed)")
+        return written, failed
+    
+    async def get_pg_pool(self):
+        """asyncpg pool for direct batch writes, None when DATABASE_URL isn't configured"""
+        if not DATABASE_URL:
+            return None
+        import asyncpg
+        return await asyncpg.create_pool(DATABASE_URL, min_size=2, max_size=10)
+    
+    async def write_items_pg(self, pool, new_rows: List[Dict[str, Any]], update_rows: List[Dict[str, Any]]) -> tuple:
+        """Write items over asyncpg, chunks concurrently - COPY for new rows, ON CONFLICT for updates"""
+        new_groups, new_duplicates = self.group_item_rows(new_rows)
+        update_groups, update_duplicates = self.group_item_rows(update_rows)
+        
+        async def write_chunk(columns: tuple, chunk: List[Dict[str, Any]], copy: bool) -> tuple:
+            records = [tuple(_pg_value(column, row[column]) for column in columns) for row in chunk]
+            upsert_sql = _pg_upsert_sql(columns)
+            try:
+                async with pool.acquire() as conn:
+                    if copy:
+                        await conn.copy_records_to_table('items', records=records, columns=list(columns))
+                    else:
+                        await conn.executemany(upsert_sql, records)
+                return len(chunk), 0
+            except Exception as e:
+                # COPY/executemany are all-or-nothing - retry row by row to isolate the bad one
+                print(f"⚠️ Writing {len(chunk)} items failed ({e}), retrying one by one...")
+            
+            written = 0
+            failed = 0
+            async with pool.acquire() as conn:
+                for row, record in zip(chunk, records):
+                    try:
+                        await conn.execute(upsert_sql, *record)
+                        written += 1
+                    except Exception as row_error:
+                        print(f"🔴 Error upserting item {row['name']}: {row_error}")
+                        failed += 1
+            return written, failed
+        
+        results = await asyncio.gather(*[
+            write_chunk(columns, group_rows[i:i + UPSERT_CHUNK_SIZE], copy)
+            for groups, copy in ((new_groups, True), (update_groups, False))
+            for columns, group_rows in groups.items()
+            for i in range(0, len(group_rows), UPSERT_CHUNK_SIZE)
+        ])
+        
+        written = new_duplicates + update_duplicates + sum(chunk_written for chunk_written, _ in results)
+        failed = sum(chunk_failed for _, chunk_failed in results)
+        logger.info(f"💾 Wrote {written} items via Postgres ({failed} failed)")
+        return written, failed
+    
+    async def process_batch(self, items: Iterable[Dict[str, str]]) -> None:
+        """Process items concurrently in chunks - items can be a lazy iterator (streamed batch file)"""
+        total = len(items) if hasattr(items, '__len__') else None
+        logger.info(f"🚀 Starting batch processing of {total if total is not None else 'streamed'} items ({self.concurrency} concurrent)...")
+        
+        # Opened up front so a bad DATABASE_URL fails before any Gemini work
+        pool = await self.get_pg_pool()
+        
+        success_count = 0
+        fail_count = 0
+        progress = {'ok': 0, 'fail': 0}
+        items = iter(items)
+        
+        # One progress bar instead of a block of prints per item; log lines are
+        # routed through tqdm so they don't break the bar
+        try:
+            with logging_redirect_tqdm(), tqdm(total=total, desc='items') as pbar:
+                while chunk := list(islice(items, BATCH_CHUNK_SIZE)):
+                    written, failed = await self.process_chunk(chunk, pool, pbar, progress)
+                    success_count += written
+                    fail_count += failed
+        finally:
+            if pool:
+                await pool.close()
+        
+        logger.info(f"📊 Batch Processing Complete!")
+        logger.info(f"✅ Successful: {success_count}")
+        logger.info(f"🔴 Failed: {fail_count}")
+        if success_count + fail_count > 0:
+            logger.info(f"📈 Success Rate: {success_count/(success_count + fail_count)*100:.1f}%")
+    
+    async def process_chunk(self, items: List[Dict[str, str]], pool, pbar, progress: Dict[str, int]) -> tuple:
+        """Prefetch, research and write one chunk of a batch - returns (succeeded, failed)"""
+        # One lookup per (category, subcategory) instead of one per item
+        existing = await asyncio.to_thread(self.prefetch_existing_items, items)
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def run(item: Dict[str, str]) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    research_data = await self.research_item(item['name'], item['category'], item.get('subcategory', ''))
+                except Exception as e:
+                    logger.warning(f"🔴 Error processing item {item}: {e}")
+                    research_data = None
+            progress['fail' if research_data is None else 'ok'] += 1
+            pbar.set_postfix(**progress)
+            pbar.update()
+            return research_data
+        
+        results = await asyncio.gather(*map(run, items))
+        
+        success_count = 0
+        fail_count = 0
+        new_rows = []
+        update_rows = []
+        
+        # Collect writes and send them in bulk once the chunk's research is done
+        for item, research_data in zip(items, results):
+            if research_data is None:
+                fail_count += 1
+                continue
+            
+            existing_item = existing.get((item['name'], item['category'], item.get('subcategory', '')))
+            if existing_item:
+                updates = self.get_columns_to_update(existing_item, research_data)
+                if not updates:
+                    logger.debug("ℹ️ No updates needed for %s", item['name'])
+                    success_count += 1
+                    continue
+                update_rows.append({
+                    'name': existing_item['name'],
+                    'category': existing_item['category'],
+                    'subcategory': existing_item['subcategory'],
+                    **updates
+                })
+            else:
+                new_rows.append(self.build_new_item(item['name'], item['category'], item.get('subcategory', ''), research_data))
+        
+        if pool:
+            written, failed = await self.write_items_pg(pool, new_rows, update_rows)
+        else:
+            written, failed = await asyncio.to_thread(self.upsert_items, new_rows + update_rows)
+        return success_count + written, fail_count + failed
 
 
 def main():
@@ -484,6 +995,7 @@ def main():
     
     # Batch mode
     parser.add_argument('--batch-file', type=str, help='JSON file with batch of items to process')
+    parser.add_argument('--batch-mode', action='store_true', help='Submit batch/sample items through Gemini Batch Mode')
     
     # Sample data mode
     parser.add_argument('--sample', action='store_true', help='Process sample data')
@@ -491,13 +1003,24 @@ def main():
     # Test mode
     parser.add_argument('--test', action='store_true', help='Test with Lionel Messi')
     
+    # Cache control
+    parser.add_argument('--force', action='store_true', help='Ignore cached research and query Gemini again')
+    
+    # Logging
+    parser.add_argument('--verbose', action='store_true', help='Log per-item diagnostics and full tracebacks')
+    
     args = parser.parse_args()
     
-    updater = WikiDBUpdater()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format='%(message)s')
+    # Keep client libraries quiet even with --verbose
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("httpcore").setLevel(logging.WARNING)
+    
+    updater = WikiDBUpdater(force_refresh=args.force)
     
     if args.test:
         # Test with Lionel Messi
-        updater.process_item("Lionel Messi", "sports", "football")
+        asyncio.run(updater.process_item("Lionel Messi", "sports", "football"))
         
     elif args.sample:
         # Process sample data
@@ -510,21 +1033,29 @@ def main():
             {'name': 'Queen', 'category': 'music', 'subcategory': 'rock'}
         ]
         
-        updater.process_batch(sample_items)
+        if args.batch_mode:
+            updater.submit_batch_mode(sample_items)
+        else:
+            asyncio.run(updater.process_batch(sample_items))
         
     elif args.batch_file:
         # Process batch file
         try:
-            with open(args.batch_file, 'r') as f:
-                items = json.load(f)
-            updater.process_batch(items)
+            with open(args.batch_file, 'rb') as f:
+                if args.batch_mode:
+                    updater.submit_batch_mode(json.load(f))
+                elif ijson:
+                    # Stream records so research starts before the whole file is parsed
+                    asyncio.run(updater.process_batch(ijson.items(f, 'item')))
+                else:
+                    asyncio.run(updater.process_batch(json.load(f)))
         except Exception as e:
             print(f"🔴 Error reading batch file: {e}")
             
     elif args.name and args.category:
         # Process single item
         subcategory = args.subcategory or ''
-        updater.process_item(args.name, args.category, subcategory)
+        asyncio.run(updater.process_item(args.name, args.category, subcategory))
         
     else:
         print("🔴 Please provide either --name and --category, --batch-file, --sample, or --test")
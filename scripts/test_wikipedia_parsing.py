@@ -1,10 +1,21 @@
 import asyncio
+import re
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.web_research.firecrawl_metadata_service import firecrawl_metadata_service
 
+_IMG_RE = re.compile(r'https://upload\.wikimedia\.org/[^\s\]"]+\.(?:jpg|jpeg|png|gif)')
+
+async def run_case(test_case):
+    """Run one metadata search and return the raw result dict"""
+    return await firecrawl_metadata_service.search_wikipedia_metadata(
+        name=test_case['name'],
+        category=test_case['category'],
+        subcategory=test_case['subcategory']
+    )
+
 async def test_wikipedia_parsing():
     """Test Wikipedia parsing with known examples"""
     
@@ -33,49 +44,44 @@ async def test_wikipedia_parsing():
     print("🧪 Testing Wikipedia Infobox Parsing")
     print("=" * 50)
     
-    for i, test_case in enumerate(test_cases, 1):
+    # Cases are independent - overlap the Firecrawl calls and report in order afterwards
+    results = await asyncio.gather(*map(run_case, test_cases), return_exceptions=True)
+    
+    for i, (test_case, result) in enumerate(zip(test_cases, results), 1):
         print(f"\n📋 Test Case {i}: {test_case['name']}")
         print(f"Category: {test_case['category']}/{test_case['subcategory']}")
         
-        try:
-            result = await firecrawl_metadata_service.search_wikipedia_metadata(
-                name=test_case['name'],
-                category=test_case['category'],
-                subcategory=test_case['subcategory']
-            )
+        if isinstance(result, Exception):
+            print(f"💥 ERROR: {result}")
+        elif result.get('success', False):
+            metadata = result.get('metadata', {})
+            reference_url = result.get('reference_url')
+            parsing_method = metadata.get('_parsing_method', 'unknown')
             
-            if result.get('success', False):
-                metadata = result.get('metadata', {})
-                reference_url = result.get('reference_url')
-                parsing_method = metadata.get('_parsing_method', 'unknown')
-                
-                print(f"✅ SUCCESS")
-                print(f"   Reference URL: {reference_url}")
-                print(f"   Parsing Method: {parsing_method}")
-                print(f"   Fields Found: {list(metadata.keys())}")
-                
-                # Check expected fields
-                missing_fields = []
-                for field in test_case['expected_fields']:
-                    if field in metadata and metadata[field]:
-                        print(f"   ✓ {field}: {metadata[field]}")
-                    else:
-                        missing_fields.append(field)
-                        print(f"   ✗ {field}: NOT FOUND")
-                
-                if missing_fields:
-                    print(f"   ⚠️  Missing: {missing_fields}")
-                
-                # Show image URL if found
-                if metadata.get('image_url'):
-                    print(f"   🖼️  Image: {metadata['image_url']}")
-                
-            else:
-                error = result.get('error', 'Unknown error')
-                print(f"❌ FAILED: {error}")
-                
-        except Exception as e:
-            print(f"💥 ERROR: {e}")
+            print(f"✅ SUCCESS")
+            print(f"   Reference URL: {reference_url}")
+            print(f"   Parsing Method: {parsing_method}")
+            print(f"   Fields Found: {list(metadata.keys())}")
+            
+            # Check expected fields
+            missing_fields = []
+            for field in test_case['expected_fields']:
+                if field in metadata and metadata[field]:
+                    print(f"   ✓ {field}: {metadata[field]}")
+                else:
+                    missing_fields.append(field)
+                    print(f"   ✗ {field}: NOT FOUND")
+            
+            if missing_fields:
+                print(f"   ⚠️  Missing: {missing_fields}")
+            
+            # Show image URL if found
+            if metadata.get('image_url'):
+                print(f"   🖼️  Image: {metadata['image_url']}")
+            
+        else:
+            error = result.get('error', 'Unknown error')
+            print(f"❌ FAILED: {error}")
         
         print("-" * 40)
     
@@ -103,12 +109,12 @@ async def test_direct_url_scraping():
             content = scrape_result.get('content', '')
             print(f"✅ Content scraped: {len(content)} characters")
             
-            # Check for infobox presence
-            if 'infobox' in content.lower():
+            # Check for infobox presence - one lowercase copy and one scan serve both checks
+            infobox_count = content.lower().count('infobox')
+            if infobox_count:
                 print("✅ Infobox found in content")
                 
                 # Count infobox occurrences
-                infobox_count = content.lower().count('infobox')
                 print(f"   Infobox mentions: {infobox_count}")
                 
                 # Check for specific game infobox classes
@@ -123,11 +129,13 @@ async def test_direct_url_scraping():
             # Check for image
             if 'upload.wikimedia.org' in content:
                 print("✅ Wikimedia images found")
-                import re
-                images = re.findall(r'https://upload\.wikimedia\.org/[^\s\]"]+\.(?:jpg|jpeg|png|gif)', content)
-                print(f"   Images found: {len(images)}")
-                if images:
-                    print(f"   First image: {images[0]}")
+                # Only the first match and a count are needed - don't build a list
+                images = _IMG_RE.finditer(content)
+                first_image = next(images, None)
+                image_count = 1 + sum(1 for _ in images) if first_image else 0
+                print(f"   Images found: {image_count}")
+                if first_image:
+                    print(f"   First image: {first_image.group()}")
             
         else:
             error = scrape_result.get('error', 'Unknown error')
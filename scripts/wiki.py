@@ -1,3 +1,7 @@
+import argparse
+import asyncio
+import csv
+import json
 import google.generativeai as genai
 import os
 from dotenv import load_dotenv
@@ -16,50 +20,67 @@ except Exception as e:
     exit()
 
 try:
-    model = genai.GenerativeModel('gemini-1.5-flash-latest') # Or 'gemini-1.5-pro-latest'
+    # JSON mode - the model returns a bare JSON object, no markdown fences to strip
+    model = genai.GenerativeModel(
+        'gemini-1.5-flash-latest', # Or 'gemini-1.5-pro-latest'
+        generation_config={"response_mime_type": "application/json"}
+    )
 except Exception as e:
     print(f"🔴 ERROR: Could not initialize the model: {e}")
     exit()
 
+# Concurrent requests in flight - well under the paid-tier QPM limit
+CONCURRENCY = 50
+
+## python scripts/wiki.py                               (Lionel Messi demo)
+## python scripts/wiki.py --names-file scripts/batch.csv   (or batch.json - any file with a name column/key)
+
 # --- Define a Research-Oriented Prompt ---
-meta_prompt = (
-"""
+def build_prompt(name):
+    return f"""
 Please research the following item metadata for a sports player:
-Name: "Lionel Messi"
+Name: "{name}"
 
 Please provide exact metadata object with year, reference URL to wikipedia page, and image URL from wikipedia page if available.:
-{
+{{
     "status": "success",
     "item_year_from": "1997", # Start of the player's professional career
     "item_year_to": "2025", # Assuming current year for ongoing career
     "reference_url": "https://en.wikipedia.org/wiki/Lionel_Messi",
     "image_url": "https://upload.wikimedia.org/wikipedia/commons/9/9b/Lionel_Messi_20180626.jpg",
-}
+}}
 
 If no information can be found, return an empty object with the following structure:
-{
+{{
     "status": "failed"
-}
+}}
 """
-)
 
 
-print(f"🔍 Sending prompt to Gemini: \"{meta_prompt[:100]}...\"") # Print a snippet of the prompt
+def load_names(path):
+    """Names from a JSON list (strings or objects with "name") or a CSV with a name column"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            return [row['name'] for row in csv.DictReader(f) if row.get('name')]
+        items = json.load(f)
+    return [item['name'] if isinstance(item, dict) else item for item in items]
 
-# --- Generate Content ---
-try:
-    # For simple text-in, text-out, use generate_content
-    response = model.generate_content(meta_prompt)
 
-    # --- Process and Display the Response ---
+def print_response(name, response):
+    """Process and display one Gemini response"""
+    print(f"\n📋 {name}")
+    if isinstance(response, Exception):
+        print(f"🔴 ERROR: An error occurred during content generation: {response}")
+        return
+    
     if response and response.text:
-        print("\n✅ Gemini's Response:")
+        print("✅ Gemini's Response:")
         print("--------------------------------------------------")
         print(response.text)
         print("--------------------------------------------------")
     else:
         # Handle cases where the response might be blocked or empty
-        print("\n⚠️ Gemini's Response was empty or blocked.")
+        print("⚠️ Gemini's Response was empty or blocked.")
         if response:
             print(f"Prompt Feedback: {response.prompt_feedback}")
             if response.candidates and response.candidates[0].finish_reason:
@@ -70,8 +91,39 @@ try:
                     print(f"  - Category: {rating.category.name}, Probability: {rating.probability.name}")
 
 
-except Exception as e:
-    print(f"\n🔴 ERROR: An error occurred during content generation: {e}")
+async def run(prompts):
+    """Send all prompts concurrently, at most CONCURRENCY at a time - results keep prompt order"""
+    sem = asyncio.Semaphore(CONCURRENCY)
+    
+    async def one(prompt):
+        async with sem:
+            return await model.generate_content_async(prompt)
+    
+    # A failed prompt comes back as its exception instead of cancelling the rest
+    return await asyncio.gather(*(one(prompt) for prompt in prompts), return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Research item metadata with Gemini')
+    parser.add_argument('--names-file', type=str, help='CSV or JSON file with item names')
+    args = parser.parse_args()
+    
+    names = load_names(args.names_file) if args.names_file else ["Lionel Messi"]
+    if not names:
+        print(f"🔴 ERROR: No names found in {args.names_file}")
+        exit()
+    prompts = [build_prompt(name) for name in names]
+    
+    print(f"🔍 Sending {len(prompts)} prompt(s) to Gemini: \"{prompts[0][:100]}...\"") # Print a snippet of the prompt
+    
+    # --- Generate Content ---
+    responses = asyncio.run(run(prompts))
+    
+    for name, response in zip(names, responses):
+        print_response(name, response)
+    
+    print("\n✨ Snippet execution complete.")
 
-print("\n✨ Snippet execution complete.")
 
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
 import asyncio
+import copy
 import logging
+import os
 import re
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
+from urllib.parse import urlparse
+import orjson
+from cachetools import TTLCache
+from tenacity import before_sleep_log, retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
 from models.top_models.enums import CategoryEnum, ResearchDepth
 from models.top import ItemCreate, ItemResponse
@@ -14,6 +21,72 @@ from utils.metadata_prompt_builder import MetadataPromptBuilder
 
 logger = logging.getLogger(__name__)
 
+try:
+    import groq
+    # Only transient failures are retried - bad requests and unparseable output are not
+    _LLM_RETRYABLE_ERRORS = (groq.RateLimitError, groq.APIConnectionError, groq.InternalServerError)
+except ImportError:
+    _LLM_RETRYABLE_ERRORS = ()
+
+# Firecrawl throttling - the free tier allows 10 requests/min and answers bursts above it
+# with empty pages rather than 429s, so cap in-flight calls and pace them per minute
+FIRECRAWL_CONCURRENCY = int(os.getenv("FIRECRAWL_CONCURRENCY", "2"))
+FIRECRAWL_RPM = int(os.getenv("FIRECRAWL_RPM", "10"))
+FIRECRAWL_MAX_RETRIES = 3
+FIRECRAWL_BASE_DELAY = 2.0
+FIRECRAWL_MAX_DELAY = 60.0
+
+class _TokenBucket:
+    """Hands out `rate` tokens per `per` seconds, refilling continuously"""
+    
+    def __init__(self, rate: int, per: float = 60.0):
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.fill_rate = rate / per
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+_FIRECRAWL_SEM = asyncio.Semaphore(FIRECRAWL_CONCURRENCY)
+_FIRECRAWL_BUCKET = _TokenBucket(FIRECRAWL_RPM)
+
+# Finished research results - repeat lookups skip the LLM + Firecrawl roundtrips for a day.
+# Entries only expire by TTL: research depends on nothing but the request inputs. This cache
+# owns research content; routes/wiki.py caches whole responses built from it for up to an
+# hour more and recomputes duplicate_info itself, so item writes need no invalidation here
+RESEARCH_CACHE_TTL = 24 * 3600
+_research_cache: TTLCache = TTLCache(maxsize=1024, ttl=RESEARCH_CACHE_TTL)
+
+# Merge order in _combine_research_results: LLM knowledge leads for core attributes,
+# Wikipedia leads for URLs
+_LLM_FIRST_FIELDS = ('description', 'group', 'item_year', 'item_year_to')
+_WEB_FIRST_FIELDS = ('reference_url', 'image_url')
+
+# Current year for LLM year validation, refreshed hourly instead of a datetime.now() per field
+_CURRENT_YEAR_CACHE = [0, 0.0]
+
+def _current_year() -> int:
+    now = time.time()
+    if now - _CURRENT_YEAR_CACHE[1] > 3600:
+        _CURRENT_YEAR_CACHE[:] = [datetime.now().year, now]
+    return _CURRENT_YEAR_CACHE[0]
+
+def _research_cache_key(
+    name: str, category: CategoryEnum, subcategory: str, user_description: Optional[str], research_depth: ResearchDepth
+) -> tuple:
+    """Normalized key - user_description is part of the LLM prompt, so it's part of the key"""
+    return (name.lower().strip(), category.value, subcategory.lower().strip(), user_description, research_depth.value)
+
 class ItemMetadataService:
     """Service for researching item metadata using LLM + Web sources"""
     
@@ -41,6 +114,17 @@ class ItemMetadataService:
                 'albums': ['Studio Album', 'Live Album', 'Compilation', 'EP', 'Soundtrack']
             }
         }
+        
+        # Lowercased once here instead of on every _validate_group call:
+        # (category, subcategory) -> {lower: canonical} for exact matches, and
+        # ordered (lower, canonical) pairs for partial matches
+        self._group_lookup: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._group_lower_list: Dict[Tuple[str, str], Tuple[Tuple[str, str], ...]] = {}
+        for category_value, subcategories in self.category_group_mappings.items():
+            for subcategory, groups in subcategories.items():
+                key = (category_value, subcategory)
+                self._group_lower_list[key] = tuple((valid_group.lower(), valid_group) for valid_group in groups)
+                self._group_lookup[key] = dict(reversed(self._group_lower_list[key]))
     
     async def research_item_metadata(
         self, 
@@ -53,20 +137,34 @@ class ItemMetadataService:
         """
         Research item metadata with LLM as primary source and Wikipedia for enhancement
         """
+        cache_key = _research_cache_key(name, category, subcategory, user_description, research_depth)
+        cached = _research_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached research for {name} ({category.value}/{subcategory})")
+            # Deep copy - research_errors/missing_attributes_filled lists must not be shared
+            return copy.deepcopy(cached)
+        
         try:
             logger.info(f"Researching metadata for: {name} ({category.value}/{subcategory}) - depth: {research_depth.value}")
             
-            # Step 1: LLM Research (Primary) - Use LLM knowledge as the main source
+            # Step 1: LLM Research (Primary)
             llm_result = await self._research_with_llm(name, category, subcategory, user_description)
             
-            # Step 2: Web Research (Enhancement) - Only for missing attributes
-            web_result = await self._research_with_web(name, category, subcategory, llm_result.get('llm_data', {}))
+            # Step 2: Web Research (Enhancement) - only started once the LLM result shows attributes
+            # missing, a fetch running alongside the LLM would spend its Firecrawl quota unit regardless
+            if self._identify_missing_attributes(llm_result.get('llm_data', {})):
+                web_raw = await self._fetch_web_metadata(name, category, subcategory)
+            else:
+                web_raw = {}
             
-            # Step 3: Combine results with LLM as primary
-            combined_result = self._combine_research_results(llm_result, web_result, category, subcategory)
+            # Step 3: Combine results with LLM as primary (web data filtered to missing attributes)
+            combined_result = self._combine_research_results(llm_result, web_raw, category, subcategory)
             combined_result['research_depth'] = research_depth.value
             
             logger.info(f"Research completed for {name} with {combined_result['llm_confidence']}% confidence")
+            # Only clean research is cached - LLM/web errors are often transient and worth retrying
+            if not combined_result['research_errors']:
+                _research_cache[cache_key] = copy.deepcopy(combined_result)
             return combined_result
             
         except Exception as e:
@@ -101,12 +199,9 @@ class ItemMetadataService:
             
             logger.info(f"Using LLM as primary metadata source for: {name}")
             
-            # Use the specialized metadata research method
-            metadata_response = self.llm_client.research_metadata(
-                name=name,
-                category=category.value,
-                subcategory=subcategory,
-                custom_prompt=prompt
+            # Use the specialized metadata research method (retried on rate limits / transient errors)
+            metadata_response = await self._call_llm(
+                name=name, category=category.value, subcategory=subcategory, custom_prompt=prompt
             )
             
             # Validate and clean the metadata
@@ -122,58 +217,108 @@ class ItemMetadataService:
             logger.warning(f"LLM research failed for {name}: {e}")
             return {'llm_confidence': 0, 'llm_data': {}, 'llm_error': str(e)}
     
-    async def _research_with_web(
-        self, 
-        name: str, 
-        category: CategoryEnum, 
-        subcategory: str,
-        llm_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Research using Wikipedia for MISSING attributes only"""
+    @retry(
+        retry=retry_if_exception_type(_LLM_RETRYABLE_ERRORS),
+        stop=stop_after_attempt(4),
+        wait=wait_random_exponential(min=1, max=20),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True
+    )
+    async def _call_llm(self, **research_kwargs) -> Any:
+        """One LLM metadata call - the sync Groq client runs in a thread so the event loop
+        keeps serving other research calls during inference"""
+        return await asyncio.to_thread(self.llm_client.research_metadata, **research_kwargs)
+    
+    async def _fetch_web_metadata(self, name: str, category: CategoryEnum, subcategory: str) -> Dict[str, Any]:
+        """Fetch raw Wikipedia metadata, filtered against the LLM data in _combine_research_results"""
         try:
             if not self.web_service._service_available:
-                return {'web_confidence': 0, 'web_data': {}, 'web_error': 'Firecrawl not available'}
-            
-            # Check what's missing from LLM data
-            missing_attributes = self._identify_missing_attributes(llm_data)
+                return {'success': False, 'error': 'Firecrawl not available'}
             
-            if not missing_attributes:
-                logger.info(f"All metadata available from LLM for {name}, skipping web research")
-                return {'web_confidence': 0, 'web_data': {}, 'web_info': 'No missing attributes'}
-            
-            logger.info(f"Searching Wikipedia for missing attributes: {missing_attributes} for {name}")
-            
-            # Search Wikipedia for metadata
-            web_result = await self.web_service.search_wikipedia_metadata(name, category.value, subcategory)
-            
-            if not web_result.get('success', False):
-                return {
-                    'web_confidence': 0, 
-                    'web_data': {}, 
-                    'web_error': web_result.get('error', 'Wikipedia search failed')
-                }
-            
-            # Filter web metadata to only include missing attributes
-            web_metadata = web_result.get('metadata', {})
-            filtered_metadata = {
-                key: value for key, value in web_metadata.items() 
-                if key in missing_attributes and value is not None
-            }
-            
-            # Add reference URL and image if available
-            if web_result.get('reference_url'):
-                filtered_metadata['reference_url'] = web_result['reference_url']
-            
-            return {
-                'web_confidence': 70,
-                'web_data': filtered_metadata,
-                'web_method': 'wikipedia_enhancement',
-                'missing_attributes_found': list(filtered_metadata.keys())
-            }
+            logger.info(f"Searching Wikipedia for metadata for {name}")
+            async with _FIRECRAWL_SEM:
+                return await self._scrape_with_retry(name, category, subcategory)
             
         except Exception as e:
             logger.warning(f"Web research failed for {name}: {e}")
-            return {'web_confidence': 0, 'web_data': {}, 'web_error': str(e)}
+            return {'success': False, 'error': str(e)}
+    
+    async def _scrape_with_retry(self, name: str, category: CategoryEnum, subcategory: str) -> Dict[str, Any]:
+        """Paced Wikipedia search, backing off when Firecrawl signals a rate limit"""
+        for attempt in range(FIRECRAWL_MAX_RETRIES + 1):
+            await _FIRECRAWL_BUCKET.acquire()
+            try:
+                web_result = await self.web_service.search_wikipedia_metadata(name, category.value, subcategory)
+            except Exception as e:
+                if not self._is_rate_limit_error(str(e)) or attempt == FIRECRAWL_MAX_RETRIES:
+                    raise
+                web_result = {'success': False, 'error': str(e)}
+            
+            if not self._is_rate_limited(web_result) or attempt == FIRECRAWL_MAX_RETRIES:
+                return web_result
+            
+            delay = self._rate_limit_delay(web_result, attempt)
+            logger.warning(f"Firecrawl rate limited for {name}, retrying in {delay:.1f}s (attempt {attempt + 1}/{FIRECRAWL_MAX_RETRIES})")
+            await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _is_rate_limit_error(error: str) -> bool:
+        error = error.lower()
+        return '429' in error or 'rate limit' in error
+    
+    def _is_rate_limited(self, web_result: Dict[str, Any]) -> bool:
+        """429s, rate-limit errors, and successful responses with no metadata (silent throttling)"""
+        if web_result.get('status_code') == 429:
+            return True
+        if not web_result.get('success', False):
+            return self._is_rate_limit_error(str(web_result.get('error', '')))
+        return not web_result.get('metadata')
+    
+    @staticmethod
+    def _rate_limit_delay(web_result: Dict[str, Any], attempt: int) -> float:
+        """Wait until X-RateLimit-Reset when the response carries it, else exponential backoff"""
+        headers = {key.lower(): value for key, value in (web_result.get('headers') or {}).items()}
+        try:
+            reset = float(headers['x-ratelimit-reset'])
+            # Either an epoch timestamp or seconds until reset
+            delay = reset - time.time() if reset > 1e9 else reset
+            return min(max(delay, 0.0), FIRECRAWL_MAX_DELAY)
+        except (KeyError, TypeError, ValueError):
+            return FIRECRAWL_BASE_DELAY * 2 ** attempt
+    
+    def _filter_web_metadata(self, web_raw: Dict[str, Any], llm_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep only the web attributes the LLM didn't provide"""
+        # Check what's missing from LLM data
+        missing_attributes = self._identify_missing_attributes(llm_data)
+        
+        if not missing_attributes:
+            logger.info("All metadata available from LLM, skipping web enhancement")
+            return {'web_confidence': 0, 'web_data': {}, 'web_info': 'No missing attributes'}
+        
+        if not web_raw.get('success', False):
+            return {
+                'web_confidence': 0, 
+                'web_data': {}, 
+                'web_error': web_raw.get('error', 'Wikipedia search failed')
+            }
+        
+        # Filter web metadata to only include missing attributes
+        web_metadata = web_raw.get('metadata', {})
+        filtered_metadata = {
+            key: value for key, value in web_metadata.items() 
+            if key in missing_attributes and value is not None
+        }
+        
+        # Add reference URL and image if available
+        if web_raw.get('reference_url'):
+            filtered_metadata['reference_url'] = web_raw['reference_url']
+        
+        return {
+            'web_confidence': 70,
+            'web_data': filtered_metadata,
+            'web_method': 'wikipedia_enhancement',
+            'missing_attributes_found': list(filtered_metadata.keys())
+        }
     
     def _identify_missing_attributes(self, llm_data: Dict[str, Any]) -> List[str]:
         """Identify which attributes are missing from LLM data"""
@@ -186,16 +331,23 @@ class ItemMetadataService:
             if not llm_data.get(attr):
                 missing.append(attr)
         
-        # Always try to get enhancement attributes from web
-        missing.extend(enhancement_attributes)
+        # Enhancement attributes come from the web unless the LLM already gave valid URLs
+        for attr in enhancement_attributes:
+            if not llm_data.get(attr):
+                missing.append(attr)
         
         return missing
     
     def _validate_llm_metadata(self, raw_metadata: dict, category: CategoryEnum, subcategory: str) -> Dict[str, Any]:
         """Validate and clean LLM metadata response"""
         validated = {}
+        max_year = _current_year() + 2
         
         try:
+            # JSON-mode clients hand back the raw completion text - no fence stripping needed
+            if isinstance(raw_metadata, (str, bytes)):
+                raw_metadata = orjson.loads(raw_metadata)
+            
             # Description
             if 'description' in raw_metadata and raw_metadata['description']:
                 validated['description'] = str(raw_metadata['description'])[:500]
@@ -209,7 +361,7 @@ class ItemMetadataService:
             if 'item_year' in raw_metadata and raw_metadata['item_year']:
                 try:
                     year = int(raw_metadata['item_year'])
-                    if 1800 <= year <= datetime.now().year + 2:
+                    if 1800 <= year <= max_year:
                         validated['item_year'] = year
                 except (ValueError, TypeError):
                     pass
@@ -217,11 +369,20 @@ class ItemMetadataService:
             if 'item_year_to' in raw_metadata and raw_metadata['item_year_to']:
                 try:
                     year_to = int(raw_metadata['item_year_to'])
-                    if 1800 <= year_to <= datetime.now().year + 2:
+                    if 1800 <= year_to <= max_year:
                         validated['item_year_to'] = year_to
                 except (ValueError, TypeError):
                     pass
             
+            # URLs - kept only if absolute http(s), so they can replace the Wikipedia lookup
+            for url_field in ('reference_url', 'image_url'):
+                url = raw_metadata.get(url_field)
+                if not url or not isinstance(url, str):
+                    continue
+                parsed = urlparse(url)
+                if parsed.scheme in ('http', 'https') and parsed.netloc:
+                    validated[url_field] = url
+            
             return validated
             
         except Exception as e:
@@ -233,16 +394,17 @@ class ItemMetadataService:
         if category.value not in self.category_group_mappings:
             return group
         
-        subcategory_groups = self.category_group_mappings[category.value].get(subcategory, [])
+        key = (category.value, subcategory)
+        group_lower = group.lower()
         
         # Try exact match
-        for valid_group in subcategory_groups:
-            if group.lower() == valid_group.lower():
-                return valid_group
+        exact = self._group_lookup.get(key, {}).get(group_lower)
+        if exact:
+            return exact
         
         # Try partial match
-        for valid_group in subcategory_groups:
-            if group.lower() in valid_group.lower() or valid_group.lower() in group.lower():
+        for valid_lower, valid_group in self._group_lower_list.get(key, ()):
+            if group_lower in valid_lower or valid_lower in group_lower:
                 return valid_group
         
         return group
@@ -250,11 +412,14 @@ class ItemMetadataService:
     def _combine_research_results(
         self, 
         llm_result: Dict[str, Any], 
-        web_result: Dict[str, Any], 
+        web_raw: Dict[str, Any], 
         category: CategoryEnum, 
         subcategory: str
     ) -> Dict[str, Any]:
-        """Combine LLM and web research results with LLM as primary source"""
+        """Combine LLM and raw web research results with LLM as primary source"""
+        
+        # Web data only fills gaps - filtered here since it was fetched without waiting for the LLM
+        web_result = self._filter_web_metadata(web_raw, llm_result.get('llm_data', {}))
         
         combined = {
             'description': None,
@@ -291,14 +456,10 @@ class ItemMetadataService:
         web_data = web_result.get('web_data', {})
         
         # Use LLM data first, fill gaps with web data
-        combined['description'] = llm_data.get('description') or web_data.get('description')
-        combined['group'] = llm_data.get('group') or web_data.get('group')
-        combined['item_year'] = llm_data.get('item_year') or web_data.get('item_year')
-        combined['item_year_to'] = llm_data.get('item_year_to') or web_data.get('item_year_to')
+        combined.update({field: llm_data.get(field) or web_data.get(field) for field in _LLM_FIRST_FIELDS})
         
-        # Web-only attributes
-        combined['reference_url'] = web_data.get('reference_url')
-        combined['image_url'] = web_data.get('image_url')
+        # Enhancement attributes - Wikipedia first, LLM-provided URLs otherwise
+        combined.update({field: web_data.get(field) or llm_data.get(field) for field in _WEB_FIRST_FIELDS})
         
         # Add metadata about sources used
         combined['primary_source'] = 'llm_training_data'
@@ -333,6 +494,13 @@ class ItemMetadataService:
     async def get_existing_groups(self, category: CategoryEnum) -> List[str]:
         """Get existing groups for a category from database"""
         try:
+            # DISTINCT runs in Postgres (data/top_extension_2.sql) - only unique groups cross the wire
+            try:
+                result = supabase.rpc('get_distinct_groups', {'cat': category.value}).execute()
+                return [row['group'] for row in result.data or []]
+            except Exception as e:
+                logger.warning(f"get_distinct_groups RPC unavailable ({e}), scanning items instead")
+            
             result = supabase.table('items').select('group').eq('category', category.value).execute()
             
             groups = set()
@@ -346,6 +514,41 @@ class ItemMetadataService:
             logger.error(f"Failed to get existing groups for {category}: {e}")
             return []
     
+    def _build_item_create(
+        self, 
+        name: str, 
+        category: CategoryEnum, 
+        subcategory: str, 
+        research_data: Dict[str, Any]
+    ) -> ItemCreate:
+        """Map research data onto an ItemCreate"""
+        return ItemCreate(
+            name=name,
+            category=category,
+            subcategory=subcategory,
+            description=research_data.get('description', f"{subcategory.title()} item"),
+            group=research_data.get('group'),
+            item_year=research_data.get('item_year'),
+            item_year_to=research_data.get('item_year_to'),
+            image_url=research_data.get('image_url'),
+            reference_url=research_data.get('reference_url')
+        )
+    
+    def _build_item_row(
+        self, 
+        name: str, 
+        category: CategoryEnum, 
+        subcategory: str, 
+        research_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Items table row for a bulk insert - validated through ItemCreate, plus the
+        researched group and image_url that ItemCreate has no fields for"""
+        # tags/accolades live in their own tables, not on the items row
+        row = self._build_item_create(name, category, subcategory, research_data).dict(exclude={'tags', 'accolades'})
+        row['group'] = research_data.get('group')
+        row['image_url'] = research_data.get('image_url')
+        return row
+    
     async def create_item_from_research(
         self, 
         name: str, 
@@ -355,17 +558,7 @@ class ItemMetadataService:
     ) -> Optional[ItemResponse]:
         """Create item from research data"""
         try:
-            item_create = ItemCreate(
-                name=name,
-                category=category,
-                subcategory=subcategory,
-                description=research_data.get('description', f"{subcategory.title()} item"),
-                group=research_data.get('group'),
-                item_year=research_data.get('item_year'),
-                item_year_to=research_data.get('item_year_to'),
-                image_url=research_data.get('image_url'),
-                reference_url=research_data.get('reference_url')
-            )
+            item_create = self._build_item_create(name, category, subcategory, research_data)
             
             created_item = await top_items_service.create_item(item_create)
             logger.info(f"Created item from research: {created_item.name} ({created_item.id})")
@@ -375,6 +568,32 @@ class ItemMetadataService:
         except Exception as e:
             logger.error(f"Failed to create item from research: {e}")
             raise
+    
+    async def create_items_from_research_batch(
+        self, 
+        items: List[Tuple[str, CategoryEnum, str, Dict[str, Any]]]
+    ) -> List[ItemResponse]:
+        """Create many items from (name, category, subcategory, research_data) with a single insert"""
+        if not items:
+            return []
+        
+        try:
+            rows = [
+                self._build_item_row(name, category, subcategory, research_data)
+                for name, category, subcategory, research_data in items
+            ]
+            
+            # Sync supabase client - keep the one bulk request off the event loop
+            result = await asyncio.to_thread(lambda: supabase.table('items').insert(rows).execute())
+            
+            created_items = [ItemResponse(**row) for row in result.data or []]
+            logger.info(f"Created {len(created_items)} items from research in one insert")
+            
+            return created_items
+            
+        except Exception as e:
+            logger.error(f"Failed to create {len(items)} items from research: {e}")
+            raise
 
 # Create service instance
 item_metadata_service = ItemMetadataService()
\ No newline at end of file
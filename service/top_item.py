@@ -1,7 +1,18 @@
+import asyncio
+import importlib.util
+import os
+import re
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
 from config.database_top import supabase
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Union, get_args, get_origin
 import uuid
-from supabase import Client
+import httpx
+import orjson
+from cachetools import LRUCache, TTLCache
+from pydantic import BaseModel
+from supabase import Client, create_client
 import logging
 from models.top import (
     ItemCreate, ItemUpdate, ItemResponse,
@@ -16,17 +27,238 @@ from models.top import (
 
 logger = logging.getLogger(__name__)
 
+# PostgREST error code for an RPC whose function doesn't exist (SQL not yet applied)
+POSTGREST_FUNCTION_NOT_FOUND = 'PGRST202'
+# Error codes for a table or view that doesn't exist (PostgREST schema cache / Postgres)
+POSTGREST_RELATION_NOT_FOUND = ('PGRST205', '42P01')
+
+# Rows per accolades insert - keeps each request well under PostgREST's payload limit
+ACCOLADE_INSERT_CHUNK_SIZE = 500
+
+# Shared PostgREST connection pool, sized for the service's concurrent request load
+POSTGREST_MAX_CONNECTIONS = int(os.getenv("POSTGREST_MAX_CONNECTIONS", "50"))
+POSTGREST_KEEPALIVE_CONNECTIONS = int(os.getenv("POSTGREST_KEEPALIVE_CONNECTIONS", "25"))
+POSTGREST_TIMEOUT = 10.0
+
+# Rows read back from our own schema skip Pydantic validation on the hot read paths
+# (typed fields are still converted, see _from_db); set TRUST_DB=false to validate fully
+TRUST_DB = os.getenv("TRUST_DB", "true").lower() != "false"
+
+# Item metadata changes rarely - serve repeat get_item_by_id lookups from memory briefly.
+# Per-item locks coalesce concurrent misses into a single fetch
+ITEM_CACHE_TTL = 30
+_item_cache: TTLCache = TTLCache(maxsize=10_000, ttl=ITEM_CACHE_TTL)
+_item_fetch_locks: Dict[str, asyncio.Lock] = {}
+
+
+# Columns read into ItemResponse/AccoladeResponse/TagResponse - queries project these
+# instead of * so generated columns (search_vector) and unused ones stay server-side
+_ITEM_COLUMNS = ('id, name, category, subcategory, reference_url, image_url, description, '
+                 'item_year, view_count, selection_count, created_at, updated_at')
+_ACCOLADE_COLUMNS = 'id, item_id, type, name, value, created_at, updated_at'
+_TAG_COLUMNS = 'id, name, created_at'
+# list_items_with_details view: item columns carry an item_ prefix -> (view column, field)
+_LIST_ITEM_VIEW_ITEM_COLUMNS = tuple(
+    (f'item_{column.strip()}', column.strip()) for column in _ITEM_COLUMNS.split(','))
+_LIST_ITEM_DETAIL_COLUMNS = 'id, ranking, created_at, updated_at, ' + ', '.join(
+    view_column for view_column, _ in _LIST_ITEM_VIEW_ITEM_COLUMNS)
+# Only the counters search_items_advanced filters on
+_ITEM_STATISTICS_FILTER_COLUMNS = 'total_appearances, top_10_count, top_3_count, first_place_count'
+
+# ItemResponse field names, resolved once - rows are trimmed to these before construction
+_ITEM_FIELDS = frozenset(ItemResponse.model_fields)
+
+
+def _decode_with_orjson(response: httpx.Response):
+    """Make response.json() parse with orjson - postgrest-py builds every result.data through it"""
+    response.read()
+    response.json = lambda **kwargs: orjson.loads(response.content)
+
+
+_SEARCH_TOKEN_RE = re.compile(r'\w+')
+
+
+def _search_tsquery(search_query: str) -> str:
+    """Prefix tsquery for free text: "mes" -> "mes:*", "lionel mes" -> "lionel:* & mes:*".
+    Only word characters are kept, so user input can't inject tsquery operators"""
+    return ' & '.join(f'{token}:*' for token in _SEARCH_TOKEN_RE.findall(search_query.lower()))
+
+
+def _apply_search_query(query, search_query: str):
+    """Match name/description through the GIN-indexed search_vector column.
+    Every word matches as a prefix of a name/description word, keeping the partial-name
+    matching of the old ilike search (though not mid-word substrings)"""
+    tsquery = _search_tsquery(search_query)
+    if not tsquery:
+        # Nothing searchable (punctuation only) - leave the other filters to decide
+        return query
+    return query.filter('search_vector', 'fts(simple)', tsquery)
+
+
+# sort_by -> (column, descending). "ranking" would need list_items joined for an
+# average ranking - view_count stands in for it
+_SEARCH_SORT_KEYS = {
+    'name': ('name', False),
+    'popularity': ('selection_count', True),
+    'recent': ('created_at', True),
+    'ranking': ('view_count', True),
+}
+
+
+def _search_sort_key(sort_by: Optional[str]) -> Tuple[str, bool]:
+    return _SEARCH_SORT_KEYS.get(sort_by, _SEARCH_SORT_KEYS['name'])
+
+
+def _postgrest_value(value: Any) -> str:
+    """Quote a value for use inside a PostgREST or=() expression"""
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _apply_sort_and_page(query, sort_by: Optional[str], limit: int, offset: int,
+                         after: Optional[Tuple[Any, uuid.UUID]]):
+    """Order by the sort column with id as tiebreaker, then page.
+    With an `after` cursor the page seeks past (sort value, id) instead of using OFFSET,
+    so deep pages cost the same as the first"""
+    column, desc = _search_sort_key(sort_by)
+    query = query.order(column, desc=desc).order('id', desc=desc)
+    if after is None:
+        return query.range(offset, offset + limit - 1)
+    
+    op = 'lt' if desc else 'gt'
+    value, last_id = _postgrest_value(after[0]), _postgrest_value(after[1])
+    return query.or_(
+        f'{column}.{op}.{value},and({column}.eq.{value},id.{op}.{last_id})'
+    ).limit(limit)
+
+
+def next_search_cursor(items: List[ItemResponse], sort_by: Optional[str] = None) -> Optional[Tuple[Any, uuid.UUID]]:
+    """Cursor for the page after `items`, to pass back as `after`; None for an empty page"""
+    if not items:
+        return None
+    last = items[-1]
+    column, _ = _search_sort_key(sort_by)
+    return getattr(last, column), last.id
+
+
+# Tags repeat across items and requests - share one TagResponse per tag id.
+# Bounded in case tag cardinality grows; tag edits should evict their entry
+_tag_cache: LRUCache = LRUCache(maxsize=50_000)
+
+
+def _intern_tag(raw: Dict[str, Any]) -> TagResponse:
+    """Canonical TagResponse for a tag row"""
+    tag = _tag_cache.get(raw['id'])
+    if tag is None:
+        tag = _tag_cache[raw['id']] = _from_db(TagResponse, raw)
+    return tag
+
+
+async def _execute(query):
+    """Run a blocking PostgREST request in a worker thread so the event loop keeps serving"""
+    return await asyncio.to_thread(query.execute)
+
+
+def _parse_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    # PostgREST timestamps are ISO 8601, sometimes with a Z suffix
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _parse_uuid(value: Any) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(value)
+
+
+def _field_converter(annotation):
+    """Converter from a JSON value to the declared field type, None when the raw value
+    already has the right type (str, int, float, bool)"""
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _field_converter(args[0]) if len(args) == 1 else None
+    if get_origin(annotation) in (list, List):
+        convert = _field_converter(get_args(annotation)[0])
+        return (lambda values: [convert(v) for v in values]) if convert else None
+    if not isinstance(annotation, type):
+        return None
+    if issubclass(annotation, BaseModel):
+        return lambda v: v if isinstance(v, annotation) else _from_db(annotation, v)
+    if issubclass(annotation, Enum):
+        return annotation
+    if annotation is uuid.UUID:
+        return _parse_uuid
+    if annotation is datetime:
+        return _parse_datetime
+    return None
+
+
+@lru_cache(maxsize=None)
+def _model_converters(model) -> Tuple[Tuple[str, Any], ...]:
+    """(field, converter) pairs for a model's non-primitive fields, resolved once per model"""
+    converters = ((name, _field_converter(field.annotation)) for name, field in model.model_fields.items())
+    return tuple((name, convert) for name, convert in converters if convert is not None)
+
+
+def _from_db(model, data: Dict[str, Any]):
+    """Build a response model from a DB row. With TRUST_DB validation is skipped, but
+    UUID/datetime/enum and nested model fields are still converted to their declared types"""
+    if not TRUST_DB:
+        return model(**data)
+    values = dict(data)
+    for name, convert in _model_converters(model):
+        value = values.get(name)
+        if value is not None:
+            values[name] = convert(value)
+    return model.model_construct(**values)
+
+
+def _pooled_client(shared: Client) -> Client:
+    """Dedicated client for the items service with a pooled keep-alive PostgREST session,
+    so concurrent requests reuse connections instead of paying TCP/TLS setup each time.
+    A separate client keeps the session swap and close() away from the shared one"""
+    client = create_client(shared.supabase_url, shared.supabase_key)
+    default_session = client.postgrest.session
+    client.postgrest.session = httpx.Client(
+        base_url=default_session.base_url,
+        headers=default_session.headers,
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_keepalive_connections=POSTGREST_KEEPALIVE_CONNECTIONS,
+                            max_connections=POSTGREST_MAX_CONNECTIONS),
+        timeout=POSTGREST_TIMEOUT,
+        event_hooks={'response': [_decode_with_orjson]}
+    )
+    default_session.close()
+    return client
+
 
 class TopItemsService:
     def __init__(self, supabase: Client):
         self.supabase = supabase
+    
+    def _insert_rows(self, table: str, rows: Any) -> List[Dict[str, Any]]:
+        """Insert through the pooled PostgREST session, returns the inserted rows.
+        orjson serializes UUIDs, enums and datetimes natively, so model dicts go in as-is"""
+        response = self.supabase.postgrest.session.post(
+            f"/{table}",
+            content=orjson.dumps(rows),
+            headers={"Content-Type": "application/json", "Prefer": "return=representation"}
+        )
+        response.raise_for_status()
+        return response.json() or []
+    
+    def close(self):
+        """Close this service's PostgREST connections - call from the app's shutdown hook.
+        Only safe for a client the service owns, like the one from _pooled_client"""
+        self.supabase.postgrest.session.close()
     # Item CRUD operations
 
     async def create_item(self, item_data: ItemCreate) -> ItemResponse:
         """Create a new item"""
         try:
-            result = self.supabase.table('items').insert(
-                item_data.dict()).execute()
+            result = await _execute(self.supabase.table('items').insert(
+                item_data.dict()))
             if result.data:
                 return ItemResponse(**result.data[0])
             raise Exception("Failed to create item")
@@ -36,23 +268,42 @@ class TopItemsService:
 
     async def get_item_by_id(self, item_id: uuid.UUID) -> Optional[ItemResponse]:
         """Get item by ID"""
+        cache_key = str(item_id)
+        cached = _item_cache.get(cache_key)
+        if cached is not None:
+            # Callers get their own copy - mutating it must not leak into other requests
+            return cached.model_copy(deep=True)
+        
+        lock = _item_fetch_locks.setdefault(cache_key, asyncio.Lock())
         try:
-            result = self.supabase.table('items').select(
-                '*').eq('id', str(item_id)).execute()
-            if result.data:
-                return ItemResponse(**result.data[0])
-            return None
+            async with lock:
+                # Another request may have filled the cache while we waited
+                cached = _item_cache.get(cache_key)
+                if cached is not None:
+                    return cached.model_copy(deep=True)
+                
+                query = self.supabase.table('items').select(_ITEM_COLUMNS).eq('id', cache_key)
+                result = await _execute(query)
+                if result.data:
+                    item = ItemResponse(**result.data[0])
+                    _item_cache[cache_key] = item
+                    return item.model_copy(deep=True)
+                return None
         except Exception as e:
             logger.error(f"Error getting item {item_id}: {e}")
             raise
+        finally:
+            if _item_fetch_locks.get(cache_key) is lock:
+                del _item_fetch_locks[cache_key]
 
     async def update_item(self, item_id: uuid.UUID, item_data: ItemUpdate) -> Optional[ItemResponse]:
         """Update an item"""
         try:
-            update_data = {k: v for k, v in item_data.dict().items()
-                           if v is not None}
-            result = self.supabase.table('items').update(
-                update_data).eq('id', str(item_id)).execute()
+            # Only fields the caller actually set - a partial update must not null out the rest
+            update_data = item_data.dict(exclude_none=True, exclude_unset=True)
+            result = await _execute(self.supabase.table('items').update(
+                update_data).eq('id', str(item_id)))
+            _item_cache.pop(str(item_id), None)
             if result.data:
                 return ItemResponse(**result.data[0])
             return None
@@ -63,8 +314,9 @@ class TopItemsService:
     async def add_item_image(self, item_id: uuid.UUID, image_url: str) -> Optional[ItemResponse]:
         """Add image to an item"""
         try:
-            result = self.supabase.table('items').update(
-                {'image_url': image_url}).eq('id', str(item_id)).execute()
+            result = await _execute(self.supabase.table('items').update(
+                {'image_url': image_url}).eq('id', str(item_id)))
+            _item_cache.pop(str(item_id), None)
             if result.data:
                 return ItemResponse(**result.data[0])
             return None
@@ -76,22 +328,22 @@ class TopItemsService:
         self,
         filters: AdvancedItemSearchFilters,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        after: Optional[Tuple[Any, uuid.UUID]] = None
     ) -> List[ItemResponse]:
-        """Search items with filters"""
+        """Search items with filters. Pass `after` (see next_search_cursor) to page by
+        keyset instead of offset"""
         try:
-            query = self.supabase.table('items').select('*')
+            query = self.supabase.table('items').select(_ITEM_COLUMNS)
 
-            # Fix: Check if category is enum or string
             if filters.category:
-                category_value = filters.category.value if hasattr(filters.category, 'value') else filters.category
-                query = query.eq('category', category_value)
+                query = query.eq('category', filters.category.value)
                 
             if filters.subcategory:
                 query = query.eq('subcategory', filters.subcategory)
                 
             if filters.search_query:
-                query = query.or_(f'name.ilike.%{filters.search_query}%,description.ilike.%{filters.search_query}%')
+                query = _apply_search_query(query, filters.search_query)
 
             # Add tag filtering if tags are provided
             if filters.tags:
@@ -104,21 +356,10 @@ class TopItemsService:
             if filters.year_to:
                 query = query.lte('item_year', filters.year_to)
 
-            # Add sorting
-            if filters.sort_by == "popularity":
-                query = query.order('selection_count', desc=True)
-            elif filters.sort_by == "recent":
-                query = query.order('created_at', desc=True)
-            elif filters.sort_by == "ranking":
-                # Would need to join with list_items for average ranking
-                query = query.order('view_count', desc=True)  # Fallback to view_count
-            else:  # default to name
-                query = query.order('name')
-
-            # Apply pagination
-            result = query.range(offset, offset + limit - 1).execute()
-
-            return [ItemResponse(**item) for item in result.data] if result.data else []
+            query = _apply_sort_and_page(query, filters.sort_by, limit, offset, after)
+            result = await _execute(query)
+
+            return [_from_db(ItemResponse, item) for item in result.data] if result.data else []
             
         except Exception as e:
             logger.error(f"Error searching items: {e}")
@@ -127,8 +368,8 @@ class TopItemsService:
     async def add_item_to_list(self, list_item_data: ListItemCreate) -> ListItemResponse:
         """Add item to list"""
         try:
-            result = self.supabase.table('list_items').insert(
-                list_item_data.dict()).execute()
+            result = await _execute(self.supabase.table('list_items').insert(
+                list_item_data.dict()))
             if result.data:
                 return ListItemResponse(**result.data[0])
             raise Exception("Failed to add item to list")
@@ -139,33 +380,48 @@ class TopItemsService:
     async def get_list_items(self, list_id: uuid.UUID) -> List[ListItemWithDetails]:
         """Get all items in a list with details, sorted by ranking"""
         try:
-            result = self.supabase.table('list_items').select('''
-                id, ranking, created_at, updated_at,
-                items (*)
-            ''').eq('list_id', str(list_id)).order('ranking').execute()
-
-            items = []
-            for item_data in result.data if result.data else []:
-                item_response = ItemResponse(**item_data['items'])
-                list_item = ListItemWithDetails(
-                    id=item_data['id'],
-                    ranking=item_data['ranking'],
-                    item=item_response,
-                    created_at=item_data['created_at'],
-                    updated_at=item_data['updated_at']
-                )
-                items.append(list_item)
-
-            return items
+            try:
+                result = await _execute(self.supabase.table('list_items_with_details').select(
+                    _LIST_ITEM_DETAIL_COLUMNS
+                ).eq('list_id', str(list_id)).order('ranking'))
+            except Exception as view_error:
+                # View not created yet (data/top_extension_2.sql) - embed the items instead
+                if getattr(view_error, 'code', None) not in POSTGREST_RELATION_NOT_FOUND:
+                    raise
+                logger.warning(f"list_items_with_details view not found ({view_error}), embedding items instead")
+                result = await _execute(self.supabase.table('list_items').select(
+                    f'id, ranking, created_at, updated_at, items ({_ITEM_COLUMNS})'
+                ).eq('list_id', str(list_id)).order('ranking'))
+
+            return self._list_items_with_details(result.data)
         except Exception as e:
             logger.error(f"Error getting list items for {list_id}: {e}")
             raise
 
+    def _list_items_with_details(self, rows: Optional[List[Dict[str, Any]]]) -> List[ListItemWithDetails]:
+        """Build ListItemWithDetails from flat list_items_with_details rows, or list_items
+        rows with the joined item under 'items' (fallback without the view)"""
+        items = []
+        for row in rows if rows else []:
+            item_data = row.get('items') or {
+                field: row[view_column] for view_column, field in _LIST_ITEM_VIEW_ITEM_COLUMNS}
+            item_response = _from_db(ItemResponse, item_data)
+            list_item = _from_db(ListItemWithDetails, {
+                'id': row['id'],
+                'ranking': row['ranking'],
+                'item': item_response,
+                'created_at': row['created_at'],
+                'updated_at': row['updated_at']
+            })
+            items.append(list_item)
+
+        return items
+
     async def remove_item_from_list(self, list_id: uuid.UUID, item_id: uuid.UUID) -> bool:
         """Remove item from list"""
         try:
-            result = self.supabase.table('list_items').delete().eq(
-                'list_id', str(list_id)).eq('item_id', str(item_id)).execute()
+            result = await _execute(self.supabase.table('list_items').delete().eq(
+                'list_id', str(list_id)).eq('item_id', str(item_id)))
             return len(result.data) > 0 if result.data else False
         except Exception as e:
             logger.error(f"Error removing item from list: {e}")
@@ -174,14 +430,32 @@ class TopItemsService:
     async def rerank_list_items(self, list_id: uuid.UUID, item_rankings: List[Dict[str, Any]]) -> List[ListItemWithDetails]:
         """Rerank items in a list"""
         try:
+            # One round-trip: apply_list_rankings (data/top_extension_2.sql) updates every
+            # ranking and returns the reranked list
+            try:
+                result = await _execute(self.supabase.rpc('apply_list_rankings', {
+                    'p_list_id': str(list_id),
+                    'p_rankings': [
+                        {'item_id': str(item_ranking['item_id']), 'new_ranking': item_ranking['new_ranking']}
+                        for item_ranking in item_rankings
+                    ]
+                }))
+                return self._list_items_with_details(result.data)
+            except Exception as rpc_error:
+                # Only fall back when the function isn't deployed - a failed batch rolled back
+                # as a whole and would fail the same way row by row
+                if getattr(rpc_error, 'code', None) != POSTGREST_FUNCTION_NOT_FOUND:
+                    raise
+                logger.warning(f"apply_list_rankings RPC not found ({rpc_error}), updating rankings one by one")
+
             # Update rankings for each item
             for item_ranking in item_rankings:
                 item_id = item_ranking['item_id']
                 new_ranking = item_ranking['new_ranking']
 
-                self.supabase.table('list_items').update({
+                await _execute(self.supabase.table('list_items').update({
                     'ranking': new_ranking
-                }).eq('list_id', str(list_id)).eq('item_id', str(item_id)).execute()
+                }).eq('list_id', str(list_id)).eq('item_id', str(item_id)))
 
             # Return updated list
             return await self.get_list_items(list_id)
@@ -194,49 +468,46 @@ class TopItemsService:
 async def get_item_analytics(self, item_id: uuid.UUID) -> Optional[ItemAnalyticsResponse]:
     """Get comprehensive analytics for an item"""
     try:
-        # Update statistics first
-        self.supabase.rpc('update_item_statistics', {
-                          'p_item_id': str(item_id)}).execute()
-
-        # Get analytics data
-        result = self.supabase.table('item_statistics').select('''
-            *,
-            items!inner(view_count, selection_count)
-        ''').eq('item_id', str(item_id)).execute()
-
+        # Statistics refresh and both scores are computed server-side in one call
+        result = await _execute(self.supabase.rpc('get_item_analytics', {
+            'p_item_id': str(item_id)}))
+        
         if not result.data:
             return None
-
-        data = result.data[0]
-
-        # Calculate popularity and trending scores
-        popularity_score = (data['items']['view_count'] * 0.3 +
-                            data['items']['selection_count'] * 0.7)
-
-        trending_score = await self._calculate_trending_score(item_id)
-
-        return ItemAnalyticsResponse(
-            item_id=item_id,
-            **{k: v for k, v in data.items() if k not in ['items']},
-            popularity_score=popularity_score,
-            trending_score=trending_score
-        )
-
+        
+        return ItemAnalyticsResponse(**result.data)
+    
     except Exception as e:
         logger.error(f"Error getting item analytics {item_id}: {e}")
         raise
 
 
 
-async def search_items_advanced(self, filters: AdvancedItemSearchFilters, limit: int = 50, offset: int = 0) -> List[ItemResponse]:
-    """Advanced search with analytics filters"""
+async def search_items_advanced(
+    self,
+    filters: AdvancedItemSearchFilters,
+    limit: int = 50,
+    offset: int = 0,
+    after: Optional[Tuple[Any, uuid.UUID]] = None
+) -> List[ItemResponse]:
+    """Advanced search with analytics filters, paged like search_items"""
     try:
-        query = self.supabase.table('items').select('''
-            *,
-            accolades (*),
-            item_tags (tags (*)),
-            item_statistics (*)
-        ''')
+        needs_statistics = bool(filters.min_appearances or filters.ranking_position_filter)
+        embeds = [
+            _ITEM_COLUMNS,
+            f'accolades ({_ACCOLADE_COLUMNS})',
+            f'item_tags (tags ({_TAG_COLUMNS}))',
+        ]
+        if needs_statistics:
+            # !inner drops items whose statistics row fails the filters below
+            embeds.append(f'item_statistics!inner ({_ITEM_STATISTICS_FILTER_COLUMNS})')
+        # Aliased inner embeds only filter rows - the full accolades/tags lists
+        # above are still returned for every matching item
+        if filters.has_accolades or filters.accolade_types:
+            embeds.append('accolade_filter:accolades!inner (type)')
+        if filters.tags:
+            embeds.append('tag_filter:item_tags!inner (tags!inner (name))')
+        query = self.supabase.table('items').select(', '.join(embeds))
 
         # Apply existing filters
         if filters.category:
@@ -244,8 +515,7 @@ async def search_items_advanced(self, filters: AdvancedItemSearchFilters, limit:
         if filters.subcategory:
             query = query.eq('subcategory', filters.subcategory)
         if filters.search_query:
-            query = query.or_(
-                f'name.ilike.%{filters.search_query}%,description.ilike.%{filters.search_query}%')
+            query = _apply_search_query(query, filters.search_query)
 
         # Apply new analytics filters
         if filters.min_popularity:
@@ -263,36 +533,27 @@ async def search_items_advanced(self, filters: AdvancedItemSearchFilters, limit:
             elif filters.ranking_position_filter == "first_place":
                 query = query.gt('item_statistics.first_place_count', 0)
 
-        result = query.range(offset, offset + limit - 1).execute()
+        # Accolade and tag filters run server-side so pagination counts matching items only
+        if filters.accolade_types:
+            query = query.in_('accolade_filter.type',
+                              [acc_type.value for acc_type in filters.accolade_types])
+        if filters.tags:
+            query = query.in_('tag_filter.tags.name', filters.tags)
+
+        result = await _execute(_apply_sort_and_page(query, filters.sort_by, limit, offset, after))
 
         items = []
         for item_data in result.data if result.data else []:
-            # Filter by accolade criteria
-            accolades = [AccoladeResponse(**acc)
+            accolades = [_from_db(AccoladeResponse, acc)
                          for acc in item_data.get('accolades', [])]
-
-            if filters.has_accolades and not accolades:
-                continue
-
-            if filters.accolade_types:
-                accolade_type_names = [acc.type for acc in accolades]
-                if not any(acc_type.value in accolade_type_names for acc_type in filters.accolade_types):
-                    continue
-
-            tags = [TagResponse(**tag['tags'])
+            tags = [_intern_tag(tag['tags'])
                     for tag in item_data.get('item_tags', [])]
 
-            # Filter by tags
-            if filters.tags:
-                item_tag_names = [tag.name for tag in tags]
-                if not any(tag in item_tag_names for tag in filters.tags):
-                    continue
-
-            item_response = ItemResponse(
-                **{k: v for k, v in item_data.items() if k not in ['accolades', 'item_tags', 'item_statistics']},
-                accolades=accolades,
-                tags=tags
-            )
+            item_response = _from_db(ItemResponse, {
+                **{k: item_data[k] for k in _ITEM_FIELDS if k in item_data},
+                'accolades': accolades,
+                'tags': tags
+            })
             items.append(item_response)
 
         return items
@@ -303,37 +564,56 @@ async def search_items_advanced(self, filters: AdvancedItemSearchFilters, limit:
 
 
 async def create_bulk_accolades(self, accolades: List[AccoladeCreate]) -> List[AccoladeResponse]:
-    """Create multiple accolades at once"""
-    try:
-        results = []
-        for accolade_data in accolades:
+    """Create multiple accolades at once, one insert per chunk"""
+    results = []
+    for start in range(0, len(accolades), ACCOLADE_INSERT_CHUNK_SIZE):
+        chunk = accolades[start:start + ACCOLADE_INSERT_CHUNK_SIZE]
+        rows = [accolade.dict() for accolade in chunk]
+        try:
+            created = await asyncio.to_thread(self._insert_rows, 'accolades', rows)
+            results.extend(AccoladeResponse(**acc) for acc in created)
+            continue
+        except Exception as e:
+            logger.warning(
+                f"Bulk insert of {len(rows)} accolades failed, retrying row by row: {e}")
+        
+        # Isolate the bad rows so the rest of the chunk still lands
+        for accolade_data, row in zip(chunk, rows):
             try:
-                result = await self.add_accolade(accolade_data)
-                results.append(result)
+                created = await asyncio.to_thread(self._insert_rows, 'accolades', row)
+                results.extend(AccoladeResponse(**acc) for acc in created)
             except Exception as e:
                 logger.warning(
                     f"Failed to create accolade for item {accolade_data.item_id}: {e}")
-                continue
-        return results
-    except Exception as e:
-        logger.error(f"Error creating bulk accolades: {e}")
-        raise
+    
+    if accolades and not results:
+        logger.error(f"Error creating bulk accolades: none of {len(accolades)} were inserted")
+    return results
 
 
 async def get_item_popularity_trends(self, item_id: uuid.UUID, days: int = 30) -> ItemPopularityResponse:
     """Get item popularity trends over time"""
     try:
-        # Get current stats
-        current_item = await self.get_item_by_id(item_id)
-        if not current_item:
+        item_query = self.supabase.table('items').select(
+            'view_count, selection_count').eq('id', str(item_id))
+        votes_query = self.supabase.rpc('get_item_recent_vote_sum', {
+                                        'p_item_id': str(item_id), 'p_days': days})
+        rank_query = self.supabase.rpc('get_item_popularity_rank', {
+                                       'p_item_id': str(item_id)})
+        
+        # The three lookups are independent - run the blocking requests side by side
+        item_result, votes_result, rank_result = await asyncio.gather(
+            _execute(item_query),
+            _execute(votes_query),
+            _execute(rank_query),
+        )
+        
+        if not item_result.data:
             raise Exception("Item not found")
+        current_item = item_result.data[0]
 
         # Calculate trend direction (simplified)
-        recent_votes = self.supabase.table('user_votes').select('vote_value').eq(
-            'item_id', str(item_id)).gte('created_at', f'now() - interval \'{days} days\'').execute()
-
-        total_recent_votes = sum(
-            vote['vote_value'] for vote in recent_votes.data) if recent_votes.data else 0
+        total_recent_votes = votes_result.data or 0
 
         if total_recent_votes > 5:
             trend = "rising"
@@ -343,14 +623,12 @@ async def get_item_popularity_trends(self, item_id: uuid.UUID, days: int = 30) -
             trend = "stable"
 
         # Get popularity rank (simplified)
-        rank_result = self.supabase.rpc('get_item_popularity_rank', {
-                                        'p_item_id': str(item_id)}).execute()
         popularity_rank = rank_result.data[0] if rank_result.data else 999
 
         return ItemPopularityResponse(
             item_id=item_id,
-            view_count=current_item.view_count,
-            selection_count=current_item.selection_count,
+            view_count=current_item['view_count'],
+            selection_count=current_item['selection_count'],
             recent_trend=trend,
             popularity_rank=popularity_rank
         )
@@ -359,5 +637,12 @@ async def get_item_popularity_trends(self, item_id: uuid.UUID, days: int = 30) -
         logger.error(f"Error getting popularity trends: {e}")
         raise
 
-# Initialize service instance
-top_items_service = TopItemsService(supabase)
+# Initialize service instance on its own pooled client
+top_items_service = TopItemsService(_pooled_client(supabase))
+
+
+def get_top_items_service() -> TopItemsService:
+    """FastAPI dependency - `svc: TopItemsService = Depends(get_top_items_service)`.
+    Reusing the shared instance is safe under concurrency: its pooled session hands
+    each in-flight request its own connection, and tests can override the dependency"""
+    return top_items_service